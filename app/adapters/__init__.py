@@ -1,5 +1,6 @@
-from .base import MarketplaceAdapter
 from .amazon_jp import AmazonJPAdapter
+from .base import BlockedPageError, MarketplaceAdapter
+from .browser_pool import BrowserPool
 from .qoo10_jp import Qoo10JPAdapter
 
-__all__ = ["MarketplaceAdapter", "AmazonJPAdapter", "Qoo10JPAdapter"]
+__all__ = ["AmazonJPAdapter", "BlockedPageError", "BrowserPool", "MarketplaceAdapter", "Qoo10JPAdapter"]
@@ -1,21 +1,248 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
 from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
 
+import httpx
+from bs4 import BeautifulSoup
+from playwright.async_api import Page, Response
+
+from app.adapters.http_client import build_http_client
+from app.adapters.in_page import extract_compact_html
+from app.adapters.page_cache import DetailPageCache
+from app.adapters.page_memo import DetailPageMemo
+from app.adapters.page_pool import PagePool
+from app.adapters.resources import ResourceBlocker, ResourcePolicy
+from app.extractors.parsing import DetailParser, parse_detail_html
 from app.models import ProductDetail, ProductStub
+from app.utils.delay import HostRateLimiter
+
+logger = logging.getLogger(__name__)
+
+BLOCK_STATUS_CODES = frozenset({403, 429, 503})
+# Robot checks and CAPTCHA pages are a few KB; real product pages are far larger.
+BLOCK_PAGE_MAX_CHARS = 100_000
+
+
+class BlockedPageError(RuntimeError):
+    """The marketplace served a robot check, CAPTCHA or rate-limit page instead of content."""
+
+    def __init__(self, url: str, reason: str, status_code: int | None = None) -> None:
+        super().__init__(f"blocked page at {url}: {reason}")
+        self.url = url
+        self.reason = reason
+        self.status_code = status_code
+
+
+@dataclass
+class DetailFetchRecord:
+    """What one fetch_detail call did beyond returning the detail."""
+
+    # The HTML came from the page cache or the in-process memo, not from the site.
+    from_cache: bool = False
+    # Seconds spent queueing for the host rate limiter, which is pacing rather than site latency.
+    rate_limit_wait: float = 0.0
+
+
+_current_fetch: ContextVar[DetailFetchRecord | None] = ContextVar("current_fetch", default=None)
+
+
+@contextmanager
+def track_detail_fetch() -> Iterator[DetailFetchRecord]:
+    """Collect a DetailFetchRecord for the fetch_detail calls made inside the block."""
+    record = DetailFetchRecord()
+    token = _current_fetch.set(record)
+    try:
+        yield record
+    finally:
+        _current_fetch.reset(token)
+
+
+def _mark_from_cache() -> None:
+    if (record := _current_fetch.get()) is not None:
+        record.from_cache = True
 
 
 class MarketplaceAdapter(ABC):
     name: str
+    screenshot_dir: Path
+    rate_limiter: HostRateLimiter | None = None
+    detail_pages: DetailPageMemo | None = None
+    page_cache: DetailPageCache | None = None
+    page_pool: PagePool | None = None
+    # Requests aborted at the context (images, fonts, trackers); None when resources load normally.
+    resource_policy: ResourcePolicy | None = None
+    resource_blocker: ResourceBlocker | None = None
+    # Browser-free parser class behind parse_detail(); with `parse_executor` set, parsing runs there.
+    parser: type[DetailParser] | None = None
+    parse_executor: Executor | None = None
+    # Read detail pages with one page.evaluate of the parser's selectors instead of page.content().
+    in_page_extraction: bool = False
+    block_selectors: tuple[str, ...] = ()
+    block_phrases: tuple[str, ...] = ()
+    # Pooled plain-HTTP client for pages that render server-side; the browser stays the fallback.
+    http_client: httpx.AsyncClient | None = None
+    http_cookies: dict[str, str] = {}
+    # Which path (HTTP or browser) served each page, reported in run_stats.json.
+    fetch_paths: Counter[str] | None = None
 
     @abstractmethod
     async def search(self, query: str, limit: int) -> list[ProductStub]:
         raise NotImplementedError
 
-    @abstractmethod
+    async def iter_search(self, query: str, limit: int) -> AsyncIterator[ProductStub]:
+        # Adapters that can emit stubs while still paging override this; the default waits for search().
+        for stub in await self.search(query=query, limit=limit):
+            yield stub
+
     async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        html = await self._load_detail_html(stub)
+        try:
+            if self.parse_executor is None or self.parser is None:
+                return self.parse_detail(html, stub)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.parse_executor, parse_detail_html, self.parser, html, stub)
+        except Exception as exc:
+            # The page is gone by now, so keep its HTML in place of a screenshot.
+            dump = self.screenshot_dir / f"detail_error_{stub.site_product_id or stub.asin or 'unknown'}.html"
+            dump.write_text(html, encoding="utf-8")
+            raise RuntimeError(f"detail parsing failed: {exc}; screenshot={dump}") from exc
+
+    async def fetch_detail_html(self, stub: ProductStub) -> str:
+        raise NotImplementedError
+
+    def parse_detail(self, html: str, stub: ProductStub) -> ProductDetail:
+        # Everything country-specific (carrier support, country, search_position) comes from `stub`.
         raise NotImplementedError
 
     @abstractmethod
     async def close(self) -> None:
         raise NotImplementedError
+
+    async def _read_detail_html(self, page: Page) -> str:
+        if not self.in_page_extraction or self.parser is None:
+            return await page.content()
+        # Block markers are shipped too so _raise_if_blocked still sees CAPTCHA forms.
+        return await extract_compact_html(page, (*self.parser.extraction_selectors, *self.block_selectors))
+
+    async def _goto(self, page: Page, url: str, **kwargs) -> Response | None:
+        # Politeness is enforced per navigation, not by idling a concurrency slot.
+        await self._wait_for_rate_limit(url)
+        response = await page.goto(url, **kwargs)
+        if response is not None and response.status in BLOCK_STATUS_CODES:
+            raise BlockedPageError(url, f"HTTP {response.status}", status_code=response.status)
+        return response
+
+    async def _wait_for_rate_limit(self, url: str) -> None:
+        if self.rate_limiter is None:
+            return
+        started = time.monotonic()
+        await self.rate_limiter.acquire(url)
+        if (record := _current_fetch.get()) is not None:
+            record.rate_limit_wait += time.monotonic() - started
+
+    def open_http_client(self, max_connections: int = 20) -> None:
+        if self.http_client is None:
+            self.http_client = build_http_client(cookies=self.http_cookies, max_connections=max_connections)
+            self.fetch_paths = Counter()
+
+    async def _close_http_client(self) -> None:
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    async def _http_get(self, url: str) -> str:
+        if self.http_client is None:
+            raise RuntimeError("HTTP client is not open")
+        await self._wait_for_rate_limit(url)
+        response = await self.http_client.get(url)
+        if response.status_code in BLOCK_STATUS_CODES:
+            raise BlockedPageError(url, f"HTTP {response.status_code}", status_code=response.status_code)
+        response.raise_for_status()
+        return response.text
+
+    async def _http_get_usable(self, url: str, required_selectors: tuple[str, ...]) -> str | None:
+        """HTML fetched over HTTP, or None when it is blocked or lacks a required selector."""
+        try:
+            html = await self._http_get(url)
+            # One parse covers both checks, and it runs off the event loop.
+            missing = await asyncio.to_thread(self._missing_selector, url, html, required_selectors)
+        except (httpx.HTTPError, BlockedPageError) as exc:
+            logger.info("http fetch of %s unusable, using the browser: %s", url, exc)
+            return None
+        if missing is not None:
+            logger.info("http fetch of %s lacks %s, using the browser", url, missing)
+            return None
+        return html
+
+    def _missing_selector(
+        self,
+        url: str,
+        html: str,
+        required_selectors: tuple[str, ...],
+    ) -> str | None:
+        """Raise on a block page, else return the first required selector the page lacks."""
+        soup = BeautifulSoup(html, "lxml")
+        if len(html) <= BLOCK_PAGE_MAX_CHARS:
+            self._raise_if_blocked_soup(url, soup)
+        missing = [selector for selector in required_selectors if soup.select_one(selector) is None]
+        return missing[0] if missing else None
+
+    def _record_path(self, path: str) -> None:
+        if self.fetch_paths is not None:
+            self.fetch_paths[path] += 1
+
+    async def _load_detail_html(self, stub: ProductStub) -> str:
+        if self.detail_pages is None:
+            return await self._load_cached_detail_html(stub)
+        key = stub.site_product_id or stub.asin or str(stub.product_url)
+        fetched = False
+
+        async def fetch() -> str:
+            nonlocal fetched
+            fetched = True
+            return await self._load_cached_detail_html(stub)
+
+        try:
+            return await self.detail_pages.get_or_fetch(key, fetch)
+        finally:
+            if not fetched:
+                _mark_from_cache()
+
+    async def _load_cached_detail_html(self, stub: ProductStub) -> str:
+        if self.page_cache is None:
+            return await self.fetch_detail_html(stub)
+        url = str(stub.product_url)
+        html = await asyncio.to_thread(self.page_cache.get, url)
+        if html is not None:
+            _mark_from_cache()
+        else:
+            html = await self.fetch_detail_html(stub)
+            await asyncio.to_thread(self.page_cache.put, url, html)
+        return html
+
+    def _raise_if_blocked(self, url: str, html: str) -> None:
+        if len(html) > BLOCK_PAGE_MAX_CHARS:
+            return
+        self._raise_if_blocked_soup(url, BeautifulSoup(html, "lxml"))
+
+    def _raise_if_blocked_soup(self, url: str, soup: BeautifulSoup) -> None:
+        for selector in self.block_selectors:
+            if soup.select_one(selector) is not None:
+                raise BlockedPageError(url, f"matched {selector}")
+        title = soup.title.get_text(" ", strip=True) if soup.title else ""
+        body = soup.body.get_text(" ", strip=True) if soup.body else ""
+        # Ignoring long bodies keeps product copy from matching a phrase.
+        haystack = f"{title} {body if len(body) < 3000 else ''}".lower()
+        for phrase in self.block_phrases:
+            if phrase.lower() in haystack:
+                raise BlockedPageError(url, f"found {phrase!r}")
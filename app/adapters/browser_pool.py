@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+logger = logging.getLogger(__name__)
+
+DESKTOP_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/123.0.0.0 Safari/537.36"
+)
+JP_CONTEXT_OPTIONS: dict[str, Any] = {
+    "locale": "ja-JP",
+    "user_agent": DESKTOP_USER_AGENT,
+    "extra_http_headers": {"Accept-Language": "ja-JP,ja;q=0.9,en-US;q=0.8,en;q=0.7"},
+}
+
+
+class BrowserPool:
+    """One Playwright driver and Chromium process shared by every adapter that uses the pool.
+
+    Each adapter gets its own BrowserContext (cookies, locale, UA stay per site). The browser is
+    launched by the first `new_context` and shut down when the last context is released.
+    """
+
+    def __init__(self, headless: bool = True) -> None:
+        self.headless = headless
+        self.launches = 0
+        self._lock = asyncio.Lock()
+        self._refs = 0
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+
+    async def new_context(self, **options: Any) -> BrowserContext:
+        async with self._lock:
+            if self._browser is None:
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                self.launches += 1
+                logger.info("launched shared chromium")
+            self._refs += 1
+            browser = self._browser
+        try:
+            return await browser.new_context(**options)
+        except BaseException:
+            await self._release()
+            raise
+
+    async def release(self, context: BrowserContext) -> None:
+        try:
+            await context.close()
+        finally:
+            await self._release()
+
+    async def _release(self) -> None:
+        async with self._lock:
+            self._refs -= 1
+            if self._refs > 0 or self._browser is None:
+                return
+            browser, playwright = self._browser, self._playwright
+            self._browser = self._playwright = None
+            try:
+                await browser.close()
+            finally:
+                if playwright is not None:
+                    await playwright.stop()
+            logger.info("closed shared chromium")
+
+    @property
+    def active_contexts(self) -> int:
+        return self._refs
@@ -5,9 +5,10 @@ from pathlib import Path
 
 from app.adapters.amazon_jp import AmazonJPAdapter
 from app.adapters.base import MarketplaceAdapter
+from app.adapters.browser_pool import BrowserPool
 from app.adapters.qoo10_jp import Qoo10JPAdapter
 
-AdapterFactory = Callable[[Path], Awaitable[MarketplaceAdapter]]
+AdapterFactory = Callable[..., Awaitable[MarketplaceAdapter]]
 
 
 ADAPTER_FACTORIES: dict[str, AdapterFactory] = {
@@ -20,10 +21,16 @@ def get_supported_sites() -> list[str]:
     return sorted(ADAPTER_FACTORIES)
 
 
-async def create_adapter(site: str, screenshot_dir: Path) -> MarketplaceAdapter:
+async def create_adapter(
+    site: str,
+    screenshot_dir: Path,
+    pool: BrowserPool | None = None,
+    block_resources: bool = True,
+) -> MarketplaceAdapter:
+    """Open an adapter for `site`; adapters given the same `pool` share one browser."""
     try:
         factory = ADAPTER_FACTORIES[site]
     except KeyError as exc:
         supported = ", ".join(get_supported_sites())
         raise ValueError(f"Unsupported site '{site}'. Supported sites: {supported}") from exc
-    return await factory(screenshot_dir)
+    return await factory(screenshot_dir, pool=pool, block_resources=block_resources)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import httpx
+
+from app.adapters.browser_pool import DESKTOP_USER_AGENT, JP_CONTEXT_OPTIONS
+
+HTTP_HEADERS = {
+    "User-Agent": DESKTOP_USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    **JP_CONTEXT_OPTIONS["extra_http_headers"],
+}
+
+
+def build_http_client(cookies: dict[str, str] | None = None, max_connections: int = 20) -> httpx.AsyncClient:
+    """A pooled client that presents the same locale, UA and cookies as the browser contexts."""
+    return httpx.AsyncClient(
+        # Needs the `h2` package, pulled in by the httpx[http2] requirement.
+        http2=True,
+        headers=HTTP_HEADERS,
+        cookies=cookies,
+        follow_redirects=True,
+        timeout=httpx.Timeout(20.0, connect=10.0),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from html import escape
+from typing import Any
+
+from playwright.async_api import Page
+
+# Runs in the page: outerHTML of the outermost elements matching any selector, in document order,
+# plus the visible text. Elements nested inside another kept element are dropped as duplicates.
+COMPACT_PAGE_SCRIPT = """
+([selectors, maxPerSelector, textLimit]) => {
+  const found = [];
+  for (const selector of selectors) {
+    let matches;
+    try {
+      matches = document.querySelectorAll(selector);
+    } catch (error) {
+      continue;
+    }
+    for (let i = 0; i < matches.length && i < maxPerSelector; i++) {
+      found.push(matches[i]);
+    }
+  }
+  const candidates = new Set(found);
+  const kept = [...candidates].filter((element) => {
+    for (let parent = element.parentElement; parent; parent = parent.parentElement) {
+      if (candidates.has(parent)) {
+        return false;
+      }
+    }
+    return true;
+  });
+  kept.sort((a, b) => (a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING ? -1 : 1));
+  const head = [];
+  const body = [];
+  for (const element of kept) {
+    (element.closest("head") ? head : body).push(element.outerHTML);
+  }
+  const text = document.body ? document.body.innerText.slice(0, textLimit) : "";
+  return { head, body, text };
+}
+"""
+MAX_NODES_PER_SELECTOR = 200
+PAGE_TEXT_LIMIT = 20_000
+
+
+async def extract_compact_html(page: Page, selectors: tuple[str, ...]) -> str:
+    """One evaluate round trip instead of serializing the whole DOM with page.content()."""
+    payload = await page.evaluate(COMPACT_PAGE_SCRIPT, [list(selectors), MAX_NODES_PER_SELECTOR, PAGE_TEXT_LIMIT])
+    return compact_html_from_payload(payload)
+
+
+def compact_html_from_payload(payload: dict[str, Any]) -> str:
+    """A small document the soup-based parsers read exactly like the full page."""
+    head = "".join(payload.get("head") or [])
+    body = "".join(payload.get("body") or [])
+    text = escape(payload.get("text") or "")
+    return f"<html><head>{head}</head><body>{body}<div data-page-text>{text}</div></body></html>"
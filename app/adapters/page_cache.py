@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_page_url(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{(parts.hostname or '').lower()}{parts.path.rstrip('/')}"
+
+
+class DetailPageCache:
+    """Detail-page HTML on disk, gzip-compressed and content-addressed by normalized product URL.
+
+    Entries older than `ttl_seconds` are ignored and removed on read. When the directory grows past
+    `max_bytes` the least recently written pages are evicted.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        ttl_seconds: float,
+        max_bytes: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        # get/put run in worker threads; the lock keeps the size counter and eviction consistent.
+        self._lock = threading.RLock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._size = sum(path.stat().st_size for path in self._entries())
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, url: str) -> Path:
+        digest = hashlib.sha256(normalize_page_url(url).encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.html.gz"
+
+    def get(self, url: str) -> str | None:
+        html = self._read(self.path_for(url))
+        with self._lock:
+            if html is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return html
+
+    def _read(self, path: Path) -> str | None:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if self._clock() - stat.st_mtime > self.ttl_seconds:
+            self._remove(path, stat.st_size)
+            return None
+        try:
+            return gzip.decompress(path.read_bytes()).decode("utf-8")
+        except (OSError, EOFError, UnicodeDecodeError):
+            self._remove(path, stat.st_size)
+            return None
+
+    def put(self, url: str, html: str) -> None:
+        path = self.path_for(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write next to the target and rename so a crash never leaves a torn entry behind. The
+        # thread id keeps two concurrent puts of one URL off the same temp file.
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(gzip.compress(html.encode("utf-8"), compresslevel=6))
+        with self._lock:
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._size += path.stat().st_size - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        target = int(self.max_bytes * 0.9)
+        entries = []
+        for path in self._entries():
+            try:
+                entries.append((path.stat().st_mtime, path.stat().st_size, path))
+            except FileNotFoundError:
+                continue
+        removed = 0
+        for _, size, path in sorted(entries):
+            if self._size <= target:
+                break
+            self._remove(path, size)
+            removed += 1
+        logger.info("page cache: evicted %s pages, %.1f MB left", removed, self._size / 1_000_000)
+
+    def _remove(self, path: Path, size: int) -> None:
+        with self._lock:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                return
+            self._size -= size
+
+    def _entries(self) -> list[Path]:
+        return list(self.root.glob("*/*.html.gz"))
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+import zlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+
+class DetailPageMemo:
+    """In-process detail HTML shared by every country crawled through one adapter.
+
+    Pages are stored zlib-compressed and keyed by product id, so a listing that matches several
+    country queries is loaded once. Concurrent requests for the same key wait on the first fetch;
+    a failed fetch is forgotten so the next caller tries again.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max(1, max_entries)
+        self._pages: OrderedDict[str, asyncio.Future[bytes]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[str]]) -> str:
+        while (future := self._pages.get(key)) is not None:
+            try:
+                data = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue
+                raise
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return zlib.decompress(data).decode("utf-8")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pages[key] = future
+        try:
+            html = await fetch()
+        except BaseException as exc:
+            del self._pages[key]
+            if isinstance(exc, Exception):
+                future.set_exception(exc)
+                # Waiters re-raise it themselves; don't warn about an unobserved exception.
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        future.set_result(zlib.compress(html.encode("utf-8")))
+        self.misses += 1
+        while len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+        return html
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+
+class PagePool:
+    """Detail-fetch pages of one BrowserContext, reset and handed out again instead of closed.
+
+    A page goes back to the pool after a clean use: the listeners added through `on` are removed
+    and it is navigated to about:blank. A page that raised, or has served
+    `max_uses` fetches, is closed and replaced. At most `size` idle pages are kept; the
+    pipeline grows it to its worker count.
+    """
+
+    def __init__(self, new_page: Callable[[], Awaitable[Page]], size: int = 1, max_uses: int = 50) -> None:
+        self._new_page = new_page
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self._idle: list[tuple[Page, int]] = []
+        self._listeners: dict[Page, list[tuple[str, Callable[..., Any]]]] = {}
+        self._closed = False
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def grow_to(self, size: int) -> None:
+        self.size = max(self.size, size)
+
+    def on(self, page: Page, event: str, handler: Callable[..., Any]) -> None:
+        """Subscribe to a pooled page's event until the page goes back to the pool."""
+        page.on(event, handler)
+        self._listeners.setdefault(page, []).append((event, handler))
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        if self._idle:
+            page, uses = self._idle.pop()
+            self.reused += 1
+        else:
+            page, uses = await self._new_page(), 0
+            self.created += 1
+        clean = False
+        try:
+            yield page
+            clean = True
+        finally:
+            await self._release(page, uses + 1, clean)
+
+    async def _release(self, page: Page, uses: int, clean: bool) -> None:
+        listeners = self._listeners.pop(page, [])
+        if clean and uses < self.max_uses and len(self._idle) < self.size and not self._closed:
+            try:
+                await _reset(page, listeners)
+            except Exception as exc:
+                logger.debug("page reset failed, replacing page: %s", exc)
+            else:
+                self._idle.append((page, uses))
+                return
+        self.discarded += 1
+        await _close_quietly(page)
+
+    async def close(self) -> None:
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for page, _ in idle:
+            await _close_quietly(page)
+
+
+async def _reset(page: Page, listeners: list[tuple[str, Callable[..., Any]]]) -> None:
+    if page.is_closed():
+        raise RuntimeError("page is closed")
+    for event, handler in listeners:
+        page.remove_listener(event, handler)
+    await page.goto("about:blank")
+
+
+async def _close_quietly(page: Page) -> None:
+    try:
+        await page.close()
+    except Exception as exc:
+        logger.debug("page close failed: %s", exc)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+
+from playwright.async_api import Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Readiness:
+    """What a freshly navigated page must show before its HTML is read.
+
+    Every entry of `selectors` must be attached (a comma list inside one entry matches any of
+    them); with `network_idle` the page must also stop loading. All of it shares `timeout_ms`.
+    On timeout the page is read anyway after `fallback_ms`, the fixed sleep this replaces.
+    """
+
+    selectors: tuple[str, ...] = ()
+    network_idle: bool = False
+    timeout_ms: int = 5_000
+    fallback_ms: int = 0
+
+
+async def wait_until_ready(page: Page, readiness: Readiness) -> bool:
+    deadline = time.monotonic() + readiness.timeout_ms / 1000
+    try:
+        for selector in readiness.selectors:
+            await page.wait_for_selector(selector, state="attached", timeout=_remaining_ms(deadline))
+        if readiness.network_idle:
+            await page.wait_for_load_state("networkidle", timeout=_remaining_ms(deadline))
+    except PlaywrightTimeoutError:
+        logger.debug("page not ready after %sms, falling back to a %sms wait", readiness.timeout_ms, readiness.fallback_ms)
+        if readiness.fallback_ms:
+            await page.wait_for_timeout(readiness.fallback_ms)
+        return False
+    return True
+
+
+async def wait_for_count_above(page: Page, selector: str, count: int, timeout_ms: int) -> bool:
+    """Wait until more than `count` elements match `selector`, e.g. rows appended by a "more" button."""
+    try:
+        await page.wait_for_function(
+            "([selector, count]) => document.querySelectorAll(selector).length > count",
+            arg=[selector, count],
+            timeout=timeout_ms,
+        )
+    except PlaywrightTimeoutError:
+        return False
+    return True
+
+
+def _remaining_ms(deadline: float) -> float:
+    # Playwright treats a timeout of 0 as "wait forever".
+    return max(1.0, (deadline - time.monotonic()) * 1000)
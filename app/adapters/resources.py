@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Request, Route
+
+logger = logging.getLogger(__name__)
+
+# The extractors read DOM text and attributes only; pixels, fonts and video never matter.
+HEAVY_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+TRACKER_HOSTS = (
+    "doubleclick.net",
+    "google-analytics.com",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "facebook.net",
+    "criteo.com",
+    "criteo.net",
+    "adnxs.com",
+    "scorecardresearch.com",
+)
+
+
+def _host_matches(host: str, patterns: tuple[str, ...]) -> bool:
+    return any(host == pattern or host.endswith("." + pattern) for pattern in patterns)
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """Which requests a site's browser context aborts.
+
+    A request is blocked if its resource type is in `blocked_types` or its host (or a parent
+    domain) is in `blocked_hosts`, unless its host is in `allowed_hosts`.
+    """
+
+    blocked_types: frozenset[str] = HEAVY_RESOURCE_TYPES
+    blocked_hosts: tuple[str, ...] = TRACKER_HOSTS
+    allowed_hosts: tuple[str, ...] = ()
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        host = (urlsplit(url).hostname or "").lower()
+        if not host:
+            return False
+        if _host_matches(host, self.allowed_hosts):
+            return False
+        return resource_type in self.blocked_types or _host_matches(host, self.blocked_hosts)
+
+
+class ResourceBlocker:
+    """Routes every request of a context through a ResourcePolicy and counts what it saved."""
+
+    def __init__(self, policy: ResourcePolicy) -> None:
+        self.policy = policy
+        self.blocked: Counter[str] = Counter()
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+
+    @classmethod
+    async def install(cls, context: BrowserContext, policy: ResourcePolicy) -> ResourceBlocker:
+        blocker = cls(policy)
+        await context.route("**/*", blocker.handle)
+        context.on("requestfinished", blocker.observe_finished)
+        return blocker
+
+    async def handle(self, route: Route) -> None:
+        request = route.request
+        if self.policy.blocks(request.resource_type, request.url):
+            self.blocked[request.resource_type] += 1
+            await route.abort("blockedbyclient")
+            return
+        self.allowed_requests += 1
+        await route.continue_()
+
+    async def observe_finished(self, request: Request) -> None:
+        # Sizes as received on the wire, so chunked and compressed bodies count too,
+        # unlike a content-length header.
+        try:
+            sizes = await request.sizes()
+        except Exception as exc:
+            logger.debug("no sizes for %s: %s", request.url, exc)
+            return
+        self.allowed_bytes += max(0, sizes["responseBodySize"]) + max(0, sizes["responseHeadersSize"])
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "blocked_requests": sum(self.blocked.values()),
+            "blocked_by_type": dict(sorted(self.blocked.items())),
+            "allowed_requests": self.allowed_requests,
+            "allowed_bytes": self.allowed_bytes,
+        }
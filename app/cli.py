@@ -2,30 +2,129 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import multiprocessing
+import os
+import socket
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from datetime import timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import typer
 
+from app.adapters.base import MarketplaceAdapter
 from app.adapters.factory import create_adapter, get_supported_sites
-from app.countries import get_default_query, get_supported_countries
-from app.output.writers import (
-    write_csv,
-    write_failed_jsonl,
-    write_invalid_csv,
-    write_invalid_jsonl,
-    write_jsonl,
-)
+from app.adapters.page_cache import DetailPageCache
+from app.countries import COUNTRY_REGISTRY, get_default_query, get_supported_countries
+from app.pipeline.circuit import CircuitBreaker
+from app.pipeline.concurrency import AdaptiveLimiter
 from app.pipeline.crawler import CrawlPipeline
+from app.pipeline.distributed import run_coordinator, run_worker
+from app.pipeline.incremental import PreviousResults
+from app.pipeline.jobqueue import JobQueue
+from app.pipeline.journal import CrawlJournal, JournalMismatchError
+from app.pipeline.matrix import CrawlTarget, run_matrix, run_target
+from app.utils.delay import HostRateLimiter
 from app.utils.logging import configure_logging
+from app.utils.loop_monitor import EventLoopLagMonitor
 
 app = typer.Typer(help="Marketplace crawler CLI")
 logger = logging.getLogger(__name__)
 
+MAX_LIMIT = 5000
+
+
+@dataclass(frozen=True)
+class FetchOptions:
+    """Detail-fetch options shared by crawl, crawl-worker and crawl-matrix."""
+
+    concurrency: int
+    adaptive: bool
+    min_delay: float
+    max_delay: float
+    rate: float | None
+    max_retries: int
+    detail_timeout: float
+    block_threshold: int
+    block_cooldown: float
+    page_cache: Path | None
+    page_cache_ttl_hours: float
+    page_cache_max_mb: int
+    parse_workers: int
+    in_page_extraction: bool
+    block_resources: bool
+    http_fast_path: bool
 
-@app.callback()
-def main() -> None:
-    """CLI root."""
+    def build_rate_limiter(self) -> HostRateLimiter | None:
+        return _build_rate_limiter(self.rate, self.min_delay, self.max_delay, self.concurrency)
+
+    def build_circuit_breaker(self) -> CircuitBreaker:
+        return CircuitBreaker(threshold=self.block_threshold, cooldown=self.block_cooldown)
+
+    def build_page_cache(self) -> DetailPageCache | None:
+        return _build_page_cache(self.page_cache, self.page_cache_ttl_hours, self.page_cache_max_mb)
+
+    def build_parse_executor(self) -> ProcessPoolExecutor | None:
+        return _build_parse_executor(self.parse_workers)
+
+
+# Options shared by crawl, crawl-worker and crawl-matrix, defined once so the commands cannot drift.
+CONCURRENCY_OPTION = typer.Option(
+    3, "--concurrency", min=1, max=32, help="Starting concurrency (per site for crawl-matrix)."
+)
+ADAPTIVE_OPTION = typer.Option(
+    True,
+    "--adaptive/--fixed-concurrency",
+    help="Tune concurrency from latency, errors and timeouts (AIMD) instead of keeping it fixed.",
+)
+MIN_DELAY_OPTION = typer.Option(1.0, "--min-delay")
+MAX_DELAY_OPTION = typer.Option(3.0, "--max-delay")
+RATE_OPTION = typer.Option(
+    None,
+    "--rate",
+    min=0.01,
+    help="Requests per second per host. Defaults to --concurrency / mean(--min-delay, --max-delay).",
+)
+MAX_RETRIES_OPTION = typer.Option(3, "--max-retries", min=1, max=10)
+DETAIL_TIMEOUT_OPTION = typer.Option(90.0, "--detail-timeout", min=1.0)
+BLOCK_THRESHOLD_OPTION = typer.Option(
+    3,
+    "--block-threshold",
+    min=1,
+    help="Consecutive robot-check/CAPTCHA pages before a host is paused.",
+)
+BLOCK_COOLDOWN_OPTION = typer.Option(120.0, "--block-cooldown", min=1.0, help="Seconds a blocked host is paused.")
+PAGE_CACHE_OPTION = typer.Option(
+    None,
+    "--page-cache",
+    help="Directory for cached detail-page HTML. Cached pages within the TTL are parsed without a page visit.",
+)
+PAGE_CACHE_TTL_OPTION = typer.Option(12.0, "--page-cache-ttl-hours", min=0.0)
+PAGE_CACHE_MAX_MB_OPTION = typer.Option(1024, "--page-cache-max-mb", min=1)
+PARSE_WORKERS_OPTION = typer.Option(
+    os.cpu_count() or 1,
+    "--parse-workers",
+    min=0,
+    help="Processes for detail-page parsing. 0 parses on the event loop.",
+)
+IN_PAGE_EXTRACTION_OPTION = typer.Option(
+    False,
+    "--in-page-extraction",
+    help="Read detail pages with one page.evaluate of the parser's selectors instead of the full DOM.",
+)
+BLOCK_RESOURCES_OPTION = typer.Option(
+    True,
+    "--block-resources/--load-resources",
+    help="Abort image, font, media and tracker requests in the browser.",
+)
+HTTP_FAST_PATH_OPTION = typer.Option(
+    True,
+    "--http-fast-path/--browser-only",
+    help="Fetch server-rendered pages over pooled HTTP first and open the browser only as a fallback.",
+)
 
 
 @app.command("crawl")
@@ -33,32 +132,109 @@ def crawl(
     site: str = typer.Option("amazon_jp", "--site"),
     country: str = typer.Option("kr", "--country"),
     query: Optional[str] = typer.Option(None, "--query"),
-    limit: int = typer.Option(50, "--limit", min=1, max=200),
+    limit: int = typer.Option(50, "--limit", min=1, max=MAX_LIMIT),
     out: Path = typer.Option(Path("./out"), "--out"),
-    concurrency: int = typer.Option(3, "--concurrency", min=1, max=8),
-    min_delay: float = typer.Option(1.0, "--min-delay"),
-    max_delay: float = typer.Option(3.0, "--max-delay"),
-    max_retries: int = typer.Option(3, "--max-retries", min=1, max=10),
-    detail_timeout: float = typer.Option(90.0, "--detail-timeout", min=1.0),
+    concurrency: int = CONCURRENCY_OPTION,
+    max_concurrency: int = typer.Option(12, "--max-concurrency", min=1, max=32),
+    adaptive: bool = ADAPTIVE_OPTION,
+    min_delay: float = MIN_DELAY_OPTION,
+    max_delay: float = MAX_DELAY_OPTION,
+    rate: Optional[float] = RATE_OPTION,
+    max_retries: int = MAX_RETRIES_OPTION,
+    detail_timeout: float = DETAIL_TIMEOUT_OPTION,
+    block_threshold: int = BLOCK_THRESHOLD_OPTION,
+    block_cooldown: float = BLOCK_COOLDOWN_OPTION,
+    page_cache: Optional[Path] = PAGE_CACHE_OPTION,
+    page_cache_ttl_hours: float = PAGE_CACHE_TTL_OPTION,
+    page_cache_max_mb: int = PAGE_CACHE_MAX_MB_OPTION,
+    parse_workers: int = PARSE_WORKERS_OPTION,
+    in_page_extraction: bool = IN_PAGE_EXTRACTION_OPTION,
+    block_resources: bool = BLOCK_RESOURCES_OPTION,
+    http_fast_path: bool = HTTP_FAST_PATH_OPTION,
+    time_budget: Optional[float] = typer.Option(
+        None,
+        "--time-budget",
+        min=1.0,
+        help="Seconds. Stop starting detail fetches that would not finish in time; leftovers go to skipped.jsonl.",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental/--full",
+        help="Reuse published details whose search-result price/reviews/sales/badge are unchanged.",
+    ),
+    dashboard_data: Path = typer.Option(Path("./dashboard/data"), "--dashboard-data"),
+    max_age_hours: float = typer.Option(72.0, "--max-age-hours", min=0.0, help="Oldest detail --incremental may reuse."),
+    loop_stats: bool = typer.Option(
+        False,
+        "--loop-stats",
+        help="Record event-loop lag and detail throughput in run_stats.json.",
+    ),
+    queue_db: Optional[Path] = typer.Option(
+        None,
+        "--queue-db",
+        help="Coordinator mode: queue detail jobs in this SQLite file for crawl-worker processes.",
+    ),
+    lease_seconds: float = typer.Option(600.0, "--lease-seconds", min=1.0, help="Job lease for --queue-db workers."),
+    resume: bool = typer.Option(False, "--resume", help="Continue an interrupted run in --out."),
     verbose: bool = typer.Option(False, "--verbose"),
 ) -> None:
     """Crawl marketplace and export JSONL/CSV results."""
     configure_logging(verbose=verbose)
 
-    supported_sites = get_supported_sites()
-    if site not in supported_sites:
-        supported = ", ".join(supported_sites)
-        raise typer.BadParameter(f"Unsupported --site {site}. Supported: {supported}")
+    _validate_site(site)
+    _validate_country(country)
+    _validate_delays(min_delay, max_delay)
+    fetch = FetchOptions(
+        concurrency=concurrency,
+        adaptive=adaptive,
+        min_delay=min_delay,
+        max_delay=max_delay,
+        rate=rate,
+        max_retries=max_retries,
+        detail_timeout=detail_timeout,
+        block_threshold=block_threshold,
+        block_cooldown=block_cooldown,
+        page_cache=page_cache,
+        page_cache_ttl_hours=page_cache_ttl_hours,
+        page_cache_max_mb=page_cache_max_mb,
+        parse_workers=parse_workers,
+        in_page_extraction=in_page_extraction,
+        block_resources=block_resources,
+        http_fast_path=http_fast_path,
+    )
 
-    supported_countries = get_supported_countries()
-    if country not in supported_countries:
-        supported = ", ".join(supported_countries)
-        raise typer.BadParameter(f"Unsupported --country {country}. Supported: {supported}")
+    effective_query = query if query is not None else get_default_query(site=site, country=country)
 
-    if min_delay > max_delay:
-        raise typer.BadParameter("--min-delay must be <= --max-delay")
+    if resume:
+        try:
+            journal = CrawlJournal.resume(out, site=site, country=country, query=effective_query, limit=limit)
+        except (FileNotFoundError, JournalMismatchError) as exc:
+            raise typer.BadParameter(f"cannot --resume: {exc}") from exc
+    else:
+        journal = CrawlJournal.start(out, site=site, country=country, query=effective_query, limit=limit)
 
-    effective_query = query if query is not None else get_default_query(site=site, country=country)
+    if queue_db is not None:
+        if time_budget is not None or incremental or page_cache is not None:
+            journal.close()
+            raise typer.BadParameter(
+                "--time-budget, --incremental and --page-cache are not supported with --queue-db; "
+                "give crawl-worker its own --page-cache"
+            )
+        queue = _open_job_queue(queue_db, journal, lease_seconds=lease_seconds, max_attempts=fetch.max_retries, resume=resume)
+        try:
+            asyncio.run(
+                _run_coordinator(
+                    site=site,
+                    out=out,
+                    limit=limit,
+                    queue=queue,
+                    journal=journal,
+                    fetch=fetch,
+                )
+            )
+        finally:
+            queue.close()
+        return
 
     asyncio.run(
         _run_crawl(
@@ -67,11 +243,16 @@ def crawl(
             query=effective_query,
             limit=limit,
             out=out,
-            concurrency=concurrency,
-            min_delay=min_delay,
-            max_delay=max_delay,
-            max_retries=max_retries,
-            detail_timeout=detail_timeout,
+            fetch=fetch,
+            max_concurrency=max_concurrency,
+            time_budget=time_budget,
+            previous=(
+                PreviousResults.from_dashboard(dashboard_data, site, country, max_age=timedelta(hours=max_age_hours))
+                if incremental
+                else None
+            ),
+            loop_stats=loop_stats,
+            journal=journal,
         )
     )
 
@@ -82,47 +263,403 @@ async def _run_crawl(
     query: str,
     limit: int,
     out: Path,
-    concurrency: int,
-    min_delay: float,
-    max_delay: float,
-    max_retries: int,
-    detail_timeout: float,
+    fetch: FetchOptions,
+    max_concurrency: int,
+    time_budget: float | None,
+    previous: PreviousResults | None,
+    loop_stats: bool,
+    journal: CrawlJournal,
 ) -> None:
     out.mkdir(parents=True, exist_ok=True)
-    screenshot_dir = out / "screenshots"
+    target = CrawlTarget(site=site, country=country, query=query, out_dir=out)
 
-    adapter = await create_adapter(site=site, screenshot_dir=screenshot_dir)
     try:
-        pipeline = CrawlPipeline(
-            adapter=adapter,
-            out_dir=out,
-            concurrency=concurrency,
-            min_delay=min_delay,
-            max_delay=max_delay,
-            max_retries=max_retries,
-            detail_timeout=detail_timeout,
+        adapter = await _open_adapter(site, out, fetch)
+    except BaseException:
+        journal.close()
+        raise
+    try:
+        pipeline = _build_pipeline(
+            adapter,
+            out,
+            fetch,
+            max_concurrency=max_concurrency,
+            time_budget=time_budget,
+            previous=previous,
+            loop_monitor=EventLoopLagMonitor() if loop_stats else None,
+        )
+        await run_target(pipeline, target, limit=limit, journal=journal)
+    finally:
+        await _close_adapter(adapter)
+
+
+async def _open_adapter(site: str, out: Path, fetch: FetchOptions) -> MarketplaceAdapter:
+    adapter = await create_adapter(
+        site=site,
+        screenshot_dir=out / "screenshots",
+        block_resources=fetch.block_resources,
+    )
+    adapter.page_cache = fetch.build_page_cache()
+    adapter.in_page_extraction = fetch.in_page_extraction
+    if fetch.http_fast_path:
+        adapter.open_http_client()
+    adapter.parse_executor = fetch.build_parse_executor()
+    return adapter
+
+
+async def _close_adapter(adapter: MarketplaceAdapter) -> None:
+    await adapter.close()
+    if adapter.parse_executor is not None:
+        adapter.parse_executor.shutdown(cancel_futures=True)
+
+
+def _build_pipeline(
+    adapter: MarketplaceAdapter,
+    out: Path,
+    fetch: FetchOptions,
+    max_concurrency: int,
+    **kwargs: Any,
+) -> CrawlPipeline:
+    limiters = []
+    if fetch.adaptive:
+        max_concurrency = max(fetch.concurrency, max_concurrency)
+        limiters.append(AdaptiveLimiter(initial=fetch.concurrency, maximum=max_concurrency))
+    return CrawlPipeline(
+        adapter=adapter,
+        out_dir=out,
+        concurrency=max_concurrency if fetch.adaptive else fetch.concurrency,
+        min_delay=fetch.min_delay,
+        max_delay=fetch.max_delay,
+        max_retries=fetch.max_retries,
+        detail_timeout=fetch.detail_timeout,
+        limiters=limiters,
+        rate_limiter=fetch.build_rate_limiter(),
+        circuit_breaker=fetch.build_circuit_breaker(),
+        **kwargs,
+    )
+
+
+async def _run_coordinator(
+    site: str,
+    out: Path,
+    limit: int,
+    queue: JobQueue,
+    journal: CrawlJournal,
+    fetch: FetchOptions,
+) -> None:
+    out.mkdir(parents=True, exist_ok=True)
+    target = CrawlTarget(
+        site=site,
+        country=journal.run_info["country"],
+        query=journal.run_info["query"],
+        out_dir=out,
+    )
+    try:
+        adapter = await create_adapter(
+            site=site,
+            screenshot_dir=out / "screenshots",
+            block_resources=fetch.block_resources,
         )
-        result = await pipeline.run(query=query, limit=limit, country=country)
+    except BaseException:
+        journal.close()
+        raise
+    # The coordinator only searches, so it takes the pacing and HTTP fast path but no detail options.
+    adapter.rate_limiter = fetch.build_rate_limiter()
+    if fetch.http_fast_path:
+        adapter.open_http_client()
+    try:
+        await run_coordinator(adapter, queue, target, limit=limit, journal=journal)
     finally:
         await adapter.close()
 
-    results_jsonl = out / "results.jsonl"
-    results_csv = out / "results.csv"
-    failed_jsonl = out / "failed.jsonl"
-    invalid_jsonl = out / "invalid.jsonl"
-    invalid_csv = out / "invalid.csv"
-
-    write_jsonl(results_jsonl, result.items)
-    write_csv(results_csv, result.items)
-    write_failed_jsonl(failed_jsonl, result.failures)
-    write_invalid_jsonl(invalid_jsonl, result.invalid_items)
-    write_invalid_csv(invalid_csv, result.invalid_items)
-
-    logger.info("saved %s items to %s", len(result.items), results_jsonl)
-    logger.info("saved %s items to %s", len(result.items), results_csv)
-    logger.info("saved %s failures to %s", len(result.failures), failed_jsonl)
-    logger.info("saved %s invalid items to %s", len(result.invalid_items), invalid_jsonl)
-    logger.info("saved %s invalid items to %s", len(result.invalid_items), invalid_csv)
+
+@app.command("crawl-worker")
+def crawl_worker(
+    queue_db: Path = typer.Option(..., "--queue-db", help="Job queue written by `crawl --queue-db`."),
+    worker_id: Optional[str] = typer.Option(None, "--worker-id", help="Defaults to <hostname>-<pid>."),
+    out: Path = typer.Option(Path("./out/worker"), "--out", help="Screenshots and run_stats.json of this worker."),
+    concurrency: int = CONCURRENCY_OPTION,
+    max_concurrency: int = typer.Option(12, "--max-concurrency", min=1, max=32),
+    adaptive: bool = ADAPTIVE_OPTION,
+    min_delay: float = MIN_DELAY_OPTION,
+    max_delay: float = MAX_DELAY_OPTION,
+    rate: Optional[float] = RATE_OPTION,
+    max_retries: int = MAX_RETRIES_OPTION,
+    detail_timeout: float = DETAIL_TIMEOUT_OPTION,
+    block_threshold: int = BLOCK_THRESHOLD_OPTION,
+    block_cooldown: float = BLOCK_COOLDOWN_OPTION,
+    page_cache: Optional[Path] = PAGE_CACHE_OPTION,
+    page_cache_ttl_hours: float = PAGE_CACHE_TTL_OPTION,
+    page_cache_max_mb: int = PAGE_CACHE_MAX_MB_OPTION,
+    parse_workers: int = PARSE_WORKERS_OPTION,
+    in_page_extraction: bool = IN_PAGE_EXTRACTION_OPTION,
+    block_resources: bool = BLOCK_RESOURCES_OPTION,
+    http_fast_path: bool = HTTP_FAST_PATH_OPTION,
+    poll_interval: float = typer.Option(2.0, "--poll-interval", min=0.1, help="Seconds between polls of an empty queue."),
+    verbose: bool = typer.Option(False, "--verbose"),
+) -> None:
+    """Lease detail jobs from a coordinator's queue and post the results back."""
+    configure_logging(verbose=verbose)
+    _validate_delays(min_delay, max_delay)
+    fetch = FetchOptions(
+        concurrency=concurrency,
+        adaptive=adaptive,
+        min_delay=min_delay,
+        max_delay=max_delay,
+        rate=rate,
+        max_retries=max_retries,
+        detail_timeout=detail_timeout,
+        block_threshold=block_threshold,
+        block_cooldown=block_cooldown,
+        page_cache=page_cache,
+        page_cache_ttl_hours=page_cache_ttl_hours,
+        page_cache_max_mb=page_cache_max_mb,
+        parse_workers=parse_workers,
+        in_page_extraction=in_page_extraction,
+        block_resources=block_resources,
+        http_fast_path=http_fast_path,
+    )
+
+    try:
+        queue = JobQueue.open(queue_db)
+    except (FileNotFoundError, ValueError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    try:
+        asyncio.run(
+            _run_worker(
+                queue=queue,
+                worker_id=worker_id or f"{socket.gethostname()}-{os.getpid()}",
+                out=out,
+                fetch=fetch,
+                max_concurrency=max_concurrency,
+                poll_interval=poll_interval,
+            )
+        )
+    finally:
+        queue.close()
+
+
+async def _run_worker(
+    queue: JobQueue,
+    worker_id: str,
+    out: Path,
+    fetch: FetchOptions,
+    max_concurrency: int,
+    poll_interval: float,
+) -> None:
+    out.mkdir(parents=True, exist_ok=True)
+    adapter = await _open_adapter(queue.run_info["site"], out, fetch)
+    try:
+        pipeline = _build_pipeline(adapter, out, fetch, max_concurrency=max_concurrency)
+        await run_worker(pipeline, queue, worker=worker_id, poll_interval=poll_interval)
+    finally:
+        await _close_adapter(adapter)
+
+
+@app.command("crawl-matrix")
+def crawl_matrix(
+    sites: Optional[list[str]] = typer.Option(None, "--site", help="Repeatable. Defaults to every site."),
+    countries: Optional[list[str]] = typer.Option(None, "--country", help="Repeatable. Defaults to every country."),
+    limit: int = typer.Option(50, "--limit", min=1, max=MAX_LIMIT),
+    out: Path = typer.Option(Path("./out_matrix"), "--out"),
+    concurrency: int = CONCURRENCY_OPTION,
+    adaptive: bool = ADAPTIVE_OPTION,
+    min_delay: float = MIN_DELAY_OPTION,
+    max_delay: float = MAX_DELAY_OPTION,
+    rate: Optional[float] = RATE_OPTION,
+    max_retries: int = MAX_RETRIES_OPTION,
+    detail_timeout: float = DETAIL_TIMEOUT_OPTION,
+    block_threshold: int = BLOCK_THRESHOLD_OPTION,
+    block_cooldown: float = BLOCK_COOLDOWN_OPTION,
+    page_cache: Optional[Path] = PAGE_CACHE_OPTION,
+    page_cache_ttl_hours: float = PAGE_CACHE_TTL_OPTION,
+    page_cache_max_mb: int = PAGE_CACHE_MAX_MB_OPTION,
+    parse_workers: int = PARSE_WORKERS_OPTION,
+    in_page_extraction: bool = IN_PAGE_EXTRACTION_OPTION,
+    block_resources: bool = BLOCK_RESOURCES_OPTION,
+    http_fast_path: bool = HTTP_FAST_PATH_OPTION,
+    site_concurrency: int = typer.Option(8, "--site-concurrency", min=1, max=32),
+    global_concurrency: int = typer.Option(12, "--global-concurrency", min=1, max=64),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental/--full",
+        help="Reuse published details whose search-result price/reviews/sales/badge are unchanged.",
+    ),
+    dashboard_data: Path = typer.Option(Path("./dashboard/data"), "--dashboard-data"),
+    max_age_hours: float = typer.Option(72.0, "--max-age-hours", min=0.0, help="Oldest detail --incremental may reuse."),
+    loop_stats: bool = typer.Option(
+        False,
+        "--loop-stats",
+        help="Record event-loop lag and detail throughput in run_stats.json.",
+    ),
+    resume: bool = typer.Option(False, "--resume", help="Continue interrupted pairs under --out."),
+    verbose: bool = typer.Option(False, "--verbose"),
+) -> None:
+    """Crawl every site x country pair in one process into --out/<site>/<country>/."""
+    configure_logging(verbose=verbose)
+
+    selected_sites = sites or get_supported_sites()
+    selected_countries = countries or [
+        code for code, config in COUNTRY_REGISTRY.items() if config.crawl_enabled
+    ]
+    for site in selected_sites:
+        _validate_site(site)
+    for country in selected_countries:
+        _validate_country(country)
+    _validate_delays(min_delay, max_delay)
+    fetch = FetchOptions(
+        concurrency=concurrency,
+        adaptive=adaptive,
+        min_delay=min_delay,
+        max_delay=max_delay,
+        rate=rate,
+        max_retries=max_retries,
+        detail_timeout=detail_timeout,
+        block_threshold=block_threshold,
+        block_cooldown=block_cooldown,
+        page_cache=page_cache,
+        page_cache_ttl_hours=page_cache_ttl_hours,
+        page_cache_max_mb=page_cache_max_mb,
+        parse_workers=parse_workers,
+        in_page_extraction=in_page_extraction,
+        block_resources=block_resources,
+        http_fast_path=http_fast_path,
+    )
+
+    targets = [
+        CrawlTarget(
+            site=site,
+            country=country,
+            query=get_default_query(site=site, country=country),
+            out_dir=out / site / country,
+        )
+        for site in selected_sites
+        for country in selected_countries
+    ]
+
+    rate_limiter = fetch.build_rate_limiter()
+    # Countries of one site share a host, so they share its circuit as well.
+    circuit_breaker = fetch.build_circuit_breaker()
+
+    def make_pipeline(
+        adapter: MarketplaceAdapter,
+        target: CrawlTarget,
+        limiters: Sequence[AbstractAsyncContextManager[Any]],
+    ) -> CrawlPipeline:
+        return CrawlPipeline(
+            adapter=adapter,
+            out_dir=target.out_dir,
+            concurrency=site_concurrency,
+            min_delay=fetch.min_delay,
+            max_delay=fetch.max_delay,
+            max_retries=fetch.max_retries,
+            detail_timeout=fetch.detail_timeout,
+            limiters=limiters,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            previous=(
+                PreviousResults.from_dashboard(
+                    dashboard_data,
+                    target.site,
+                    target.country,
+                    max_age=timedelta(hours=max_age_hours),
+                )
+                if incremental
+                else None
+            ),
+            loop_monitor=EventLoopLagMonitor() if loop_stats else None,
+        )
+
+    parse_executor = fetch.build_parse_executor()
+    try:
+        outcomes = asyncio.run(
+            run_matrix(
+                targets,
+                limit=limit,
+                out_root=out,
+                site_concurrency=site_concurrency,
+                global_concurrency=global_concurrency,
+                pipeline_factory=make_pipeline,
+                resume=resume,
+                adaptive_initial=min(fetch.concurrency, site_concurrency) if fetch.adaptive else None,
+                page_cache=fetch.build_page_cache(),
+                parse_executor=parse_executor,
+                block_resources=fetch.block_resources,
+                in_page_extraction=fetch.in_page_extraction,
+                http_fast_path=fetch.http_fast_path,
+            )
+        )
+    finally:
+        if parse_executor is not None:
+            parse_executor.shutdown(cancel_futures=True)
+    failed = [target for target, error in outcomes.items() if error is not None]
+    logger.info("matrix finished: %s/%s pairs succeeded", len(outcomes) - len(failed), len(outcomes))
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def _build_rate_limiter(
+    rate: float | None,
+    min_delay: float,
+    max_delay: float,
+    concurrency: int,
+) -> HostRateLimiter | None:
+    if rate is not None:
+        return HostRateLimiter(rate=rate, jitter=0.25)
+    return HostRateLimiter.from_delays(min_delay, max_delay, concurrency)
+
+
+def _build_page_cache(root: Path | None, ttl_hours: float, max_mb: int) -> DetailPageCache | None:
+    if root is None:
+        return None
+    return DetailPageCache(root, ttl_seconds=ttl_hours * 3600, max_bytes=max_mb * 1_000_000)
+
+
+def _build_parse_executor(workers: int) -> ProcessPoolExecutor | None:
+    if workers <= 0:
+        return None
+    # spawn, not fork: the parent already runs Playwright's driver threads.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _open_job_queue(
+    path: Path,
+    journal: CrawlJournal,
+    lease_seconds: float,
+    max_attempts: int,
+    resume: bool,
+) -> JobQueue:
+    if not resume:
+        return JobQueue.create(path, journal.run_info, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    try:
+        queue = JobQueue.open(path)
+    except (FileNotFoundError, ValueError) as exc:
+        journal.close()
+        raise typer.BadParameter(f"cannot --resume: {exc}") from exc
+    if queue.run_info != journal.run_info:
+        queue.close()
+        journal.close()
+        raise typer.BadParameter(f"cannot --resume: {path} was written for {queue.run_info}")
+    return queue
+
+
+def _validate_site(site: str) -> None:
+    supported_sites = get_supported_sites()
+    if site not in supported_sites:
+        supported = ", ".join(supported_sites)
+        raise typer.BadParameter(f"Unsupported --site {site}. Supported: {supported}")
+
+
+def _validate_country(country: str) -> None:
+    supported_countries = get_supported_countries()
+    if country not in supported_countries:
+        supported = ", ".join(supported_countries)
+        raise typer.BadParameter(f"Unsupported --country {country}. Supported: {supported}")
+
+
+def _validate_delays(min_delay: float, max_delay: float) -> None:
+    if min_delay > max_delay:
+        raise typer.BadParameter("--min-delay must be <= --max-delay")
 
 
 if __name__ == "__main__":
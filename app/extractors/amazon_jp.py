@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import re
+
+from bs4 import BeautifulSoup
+
+from app.extractors.heuristics import (
+    extract_asin,
+    extract_bestseller_badge,
+    extract_bestseller_rank,
+    extract_carrier_support_for_country,
+    extract_data_amount,
+    extract_monthly_sold_count,
+    extract_network_type,
+    extract_price_jpy_with_evidence,
+    extract_review_count,
+    extract_validity_split,
+)
+from app.models import CarrierSupportKR, ProductDetail, ProductStub
+
+
+class AmazonJPParser:
+    """Pure HTML -> model parsing for amazon.co.jp; no browser state, so it can run in a worker process."""
+
+    name = "amazon_jp"
+    extraction_selectors = (
+        "title",
+        "meta",
+        "script[type='application/ld+json']",
+        "#productTitle",
+        "#title",
+        "h1.a-size-large",
+        "#feature-bullets",
+        "#productDescription",
+        "#aplus_feature_div",
+        "#productDetails_feature_div",
+        "#prodDetails",
+        "#detailBullets_feature_div",
+        "#productDetails_detailBullets_sections1",
+        "#productOverview_feature_div",
+        "#corePrice_feature_div",
+        "#corePriceDisplay_desktop_feature_div",
+        "#apex_desktop",
+        "#tp_price_block_total_price_ww",
+        "#buybox",
+        "#priceblock_ourprice",
+        "#priceblock_dealprice",
+        "#price_inside_buybox",
+        "#newBuyBoxPrice",
+        "#averageCustomerReviews_feature_div",
+        "#acrCustomerReviewText",
+        "[data-hook='total-review-count']",
+        "a[data-hook='see-all-reviews-link-foot']",
+        "a[href*='customerReviews']",
+        "[data-hook='cr-filter-info-review-rating-count']",
+        "#sellerProfileTriggerId",
+        "#merchantInfo",
+        "#bylineInfo",
+        "img[alt]",
+    )
+
+    def _normalize_product_url(self, href: str) -> str | None:
+        if "/dp/" not in href and "/gp/product/" not in href:
+            return None
+        if href.startswith("/"):
+            href = f"https://www.amazon.co.jp{href}"
+        elif href.startswith("https://") and "amazon.co.jp" not in href:
+            return None
+        href = href.split("?")[0]
+        m = re.search(r"https://www\.amazon\.co\.jp/(?:[^/]+/)?(?:dp|gp/product)/[A-Z0-9]{10}", href)
+        if m:
+            return m.group(0)
+        return href
+
+    def parse_detail(self, html: str, stub: ProductStub) -> ProductDetail:
+        evidence: dict[str, list[str]] = {}
+        soup = BeautifulSoup(html, "lxml")
+
+        title = self._extract_text_selectors(
+            soup,
+            ["#productTitle", "#title", "h1.a-size-large"],
+        )
+
+        text_blocks = self._collect_text_blocks(soup)
+
+        price_text_candidates = self._collect_price_text_candidates(soup)
+        price, non_jpy_evidence = extract_price_jpy_with_evidence(
+            price_text_candidates,
+            assume_jpy_on_unknown_currency=True,
+        )
+        if price.evidence:
+            evidence["price_jpy"] = price.evidence
+        elif stub.search_price_jpy is not None and stub.search_price_jpy > 0:
+            price.value = stub.search_price_jpy
+            evidence["price_jpy"] = [
+                f"search_result_fallback: {stub.search_price_text or stub.search_price_jpy}"
+            ]
+        else:
+            evidence["price_jpy"] = ["no_jpy_price_found_in_primary_selectors"]
+
+        if non_jpy_evidence:
+            evidence["non_jpy_price"] = non_jpy_evidence
+
+        validity_texts = [title] + text_blocks if title else text_blocks
+        validity_split = extract_validity_split(validity_texts)
+        if validity_split.usage_evidence:
+            evidence["usage_validity"] = validity_split.usage_evidence
+        if validity_split.activation_evidence:
+            evidence["activation_validity"] = validity_split.activation_evidence
+
+        data_amount = extract_data_amount(text_blocks)
+        if data_amount.evidence:
+            evidence["data_amount"] = data_amount.evidence
+
+        network_texts = [title] + text_blocks if title else text_blocks
+        network_type, network_ev = extract_network_type(network_texts)
+        if network_ev:
+            evidence["network_type"] = network_ev
+        else:
+            evidence["network_type"] = ["no_local_or_roaming_keyword_matched"]
+
+        carrier_support_local, carrier_support_kr, carrier_ev = self._extract_carrier_support(
+            text_blocks=text_blocks,
+            country=stub.country,
+        )
+        if carrier_ev:
+            evidence["carrier_support_local"] = carrier_ev
+
+        monthly_sold = extract_monthly_sold_count(text_blocks)
+        if monthly_sold.evidence:
+            evidence["monthly_sold_count"] = monthly_sold.evidence
+        elif isinstance(stub.search_monthly_sold_count, int):
+            monthly_sold.value = stub.search_monthly_sold_count
+            evidence["monthly_sold_count"] = [f"search_result_fallback: {stub.search_monthly_sold_count}"]
+
+        review_texts = self._collect_review_count_candidates(soup, text_blocks)
+        review_count = self._extract_review_count_value(review_texts)
+        if review_count.evidence:
+            evidence["review_count"] = [f"detail_page: {review_count.evidence[0]}"]
+        elif isinstance(stub.search_review_count, int):
+            review_count.value = stub.search_review_count
+            evidence["review_count"] = [f"search_result_fallback: {stub.search_review_count}"]
+
+        bestseller_badge = extract_bestseller_badge(text_blocks)
+        if bestseller_badge.evidence:
+            evidence["is_bestseller"] = bestseller_badge.evidence
+        elif isinstance(stub.search_is_bestseller, bool):
+            bestseller_badge.value = stub.search_is_bestseller
+            evidence["is_bestseller"] = [f"search_result_fallback: {stub.search_is_bestseller}"]
+
+        bestseller_rank = extract_bestseller_rank(text_blocks)
+        if bestseller_rank.evidence:
+            evidence["bestseller_rank"] = bestseller_rank.evidence
+
+        seller = self._extract_text_selectors(
+            soup,
+            ["#sellerProfileTriggerId", "#merchantInfo", "a#bylineInfo"],
+        )
+        brand = self._extract_text_selectors(
+            soup,
+            ["#bylineInfo", "tr:has(th:-soup-contains('ブランド')) td", "#productOverview_feature_div td"],
+        )
+
+        if title:
+            evidence.setdefault("title", []).append(title)
+
+        asin = stub.asin or extract_asin(str(stub.product_url))
+        if not asin:
+            asin = self._extract_asin_from_dom(soup)
+
+        return ProductDetail(
+            site=self.name,
+            country=stub.country,
+            title=title,
+            price_jpy=price.value if isinstance(price.value, int) else None,
+            review_count=review_count.value if isinstance(review_count.value, int) else None,
+            monthly_sold_count=monthly_sold.value if isinstance(monthly_sold.value, int) else None,
+            is_bestseller=bestseller_badge.value if isinstance(bestseller_badge.value, bool) else None,
+            bestseller_rank=bestseller_rank.value if isinstance(bestseller_rank.value, int) else None,
+            usage_validity=validity_split.usage_validity,
+            activation_validity=validity_split.activation_validity,
+            validity=validity_split.usage_validity or validity_split.activation_validity,
+            network_type=network_type,
+            carrier_support_local=carrier_support_local,
+            carrier_support_kr=carrier_support_kr,
+            data_amount=data_amount.value if isinstance(data_amount.value, str) else None,
+            product_url=stub.product_url,
+            asin=asin,
+            site_product_id=asin,
+            search_position=stub.search_position,
+            seller=seller,
+            brand=brand,
+            evidence=evidence,
+        )
+
+    def _collect_text_blocks(self, soup: BeautifulSoup) -> list[str]:
+        blocks: list[str] = []
+        selectors = [
+            "#feature-bullets li",
+            "#productDescription",
+            "#aplus_feature_div",
+            "#productDetails_feature_div tr",
+            "#detailBullets_feature_div li",
+            "meta[name='description']",
+            "img[alt]",
+        ]
+        for selector in selectors:
+            for node in soup.select(selector):
+                text = node.get("content") if node.name == "meta" else node.get_text(" ", strip=True)
+                if node.name == "img":
+                    text = node.get("alt") or ""
+                if text:
+                    blocks.append(text)
+
+        all_text = soup.get_text(" ", strip=True)
+        if all_text:
+            blocks.append(all_text[:5000])
+        return blocks
+
+    def _extract_carrier_support(
+        self,
+        text_blocks: list[str],
+        country: str | None,
+    ) -> tuple[dict[str, bool | None], CarrierSupportKR, list[str]]:
+        return extract_carrier_support_for_country(text_blocks, country)
+
+    def _collect_price_text_candidates(self, soup: BeautifulSoup) -> list[str]:
+        candidates: list[str] = []
+        selectors = [
+            "#corePrice_feature_div .a-offscreen",
+            "#corePriceDisplay_desktop_feature_div .a-offscreen",
+            "#apex_desktop .a-price .a-offscreen",
+            "#tp_price_block_total_price_ww .a-offscreen",
+            "#buybox .a-price .a-offscreen",
+            "#priceblock_ourprice",
+            "#priceblock_dealprice",
+            "#price_inside_buybox",
+            "#newBuyBoxPrice",
+        ]
+        for selector in selectors:
+            for node in soup.select(selector):
+                text = node.get_text(" ", strip=True)
+                if text:
+                    candidates.append(text)
+        context_patterns = [
+            r"(?:価格|税込価格|￥|¥|JPY)[^。\n\r]{0,40}[0-9][0-9,]*\s*円?",
+            r"[￥¥]\s*[0-9][0-9,]*",
+        ]
+        all_text = soup.get_text(" ", strip=True)
+        for pattern in context_patterns:
+            for match in re.finditer(pattern, all_text, re.IGNORECASE):
+                snippet = match.group(0).strip()
+                if snippet:
+                    candidates.append(snippet)
+
+        if not candidates:
+            for node in soup.select(".a-price .a-offscreen"):
+                text = node.get_text(" ", strip=True)
+                if text:
+                    candidates.append(text)
+
+        return candidates[:12]
+
+    def _collect_review_count_candidates(self, soup: BeautifulSoup, text_blocks: list[str]) -> list[str]:
+        candidates: list[str] = []
+        selectors = [
+            "#acrCustomerReviewText",
+            "span[data-hook='total-review-count']",
+            "a[data-hook='see-all-reviews-link-foot'] span",
+            "a[href*='customerReviews'] span",
+            "#averageCustomerReviews_feature_div",
+            "[data-hook='cr-filter-info-review-rating-count']",
+            "script[type='application/ld+json']",
+        ]
+        for selector in selectors:
+            for node in soup.select(selector):
+                if node.name == "script":
+                    text = node.string or node.get_text(" ", strip=True)
+                else:
+                    text = (
+                        node.get_text(" ", strip=True)
+                        or node.get("aria-label")
+                        or node.get("content")
+                        or ""
+                    )
+                if text:
+                    candidates.append(text)
+        candidates.extend(text_blocks[:5])
+        return candidates
+
+    def _extract_review_count_value(self, texts: list[str]):
+        extracted = extract_review_count(texts)
+        if extracted.evidence:
+            return extracted
+
+        for raw in texts:
+            text = raw.strip() if raw else ""
+            if not text:
+                continue
+            paren_match = re.search(r"\(\s*([0-9][0-9,]*)\s*\)", text)
+            if paren_match:
+                return type(extracted)(int(paren_match.group(1).replace(",", "")), [text[:180]])
+            bare_match = re.fullmatch(r"[#]?\s*([0-9][0-9,]*)", text)
+            if bare_match:
+                return type(extracted)(int(bare_match.group(1).replace(",", "")), [text[:180]])
+
+        return extracted
+
+    def _extract_text_selectors(self, soup: BeautifulSoup, selectors: list[str]) -> str | None:
+        for selector in selectors:
+            node = soup.select_one(selector)
+            if node:
+                text = (
+                    node.get_text(" ", strip=True)
+                    or node.get("aria-label")
+                    or node.get("content")
+                    or node.get("alt")
+                    or ""
+                )
+                if text:
+                    return text
+        return None
+
+    def _extract_asin_from_dom(self, soup: BeautifulSoup) -> str | None:
+        candidates = soup.select("#detailBullets_feature_div li, #productDetails_detailBullets_sections1 tr")
+        for row in candidates:
+            text = row.get_text(" ", strip=True)
+            match = re.search(r"([A-Z0-9]{10})", text)
+            if "ASIN" in text and match:
+                return match.group(1)
+        return None
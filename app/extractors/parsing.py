@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import Protocol
+
+from app.models import ProductDetail, ProductStub
+
+
+class DetailParser(Protocol):
+    # Outermost elements parse_detail reads; in-page extraction ships only these plus visible text.
+    extraction_selectors: tuple[str, ...]
+
+    def parse_detail(self, html: str, stub: ProductStub) -> ProductDetail: ...
+
+
+def parse_detail_html(parser: type[DetailParser], html: str, stub: ProductStub) -> ProductDetail:
+    # Module-level so a ProcessPoolExecutor can pickle it by reference along with the parser class.
+    return parser().parse_detail(html, stub)
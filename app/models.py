@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import datetime
 from enum import Enum
 from typing import Any, Optional
 
@@ -58,6 +59,8 @@ class ProductDetail(BaseModel):
     seller: Optional[str] = None
     brand: Optional[str] = None
     evidence: dict[str, list[str]] = Field(default_factory=dict)
+    fetched_at: Optional[datetime] = None
+    search_signature: Optional[str] = None
 
 
 class InvalidItem(BaseModel):
@@ -83,12 +86,14 @@ class CrawlError(BaseModel):
     error_message: str
     status_code: Optional[int] = None
     screenshot_path: Optional[str] = None
+    attempts: int = 1
 
 
 class CrawlResult(BaseModel):
     items: list[ProductDetail]
     invalid_items: list[InvalidItem]
     failures: list[CrawlError]
+    skipped: list[ProductStub] = Field(default_factory=list)
 
 
 def model_to_row(model: BaseModel) -> dict[str, Any]:
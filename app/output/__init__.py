@@ -1,3 +1,11 @@
+from .sinks import FileResultSink, MemoryResultSink, ResultSink
 from .writers import write_csv, write_failed_jsonl, write_jsonl
 
-__all__ = ["write_jsonl", "write_csv", "write_failed_jsonl"]
+__all__ = [
+    "write_jsonl",
+    "write_csv",
+    "write_failed_jsonl",
+    "ResultSink",
+    "MemoryResultSink",
+    "FileResultSink",
+]
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import csv
+import json
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.models import CrawlError, CrawlResult, InvalidItem, ProductDetail, ProductStub
+from app.output.writers import (
+    INVALID_CSV_FIELDS,
+    RESULT_CSV_FIELDS,
+    to_invalid_csv_row,
+    to_jsonl_line,
+    to_result_csv_row,
+)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+logger = logging.getLogger(__name__)
+
+
+class ResultSink(ABC):
+    """Receives pipeline outcomes one at a time as workers finish them."""
+
+    @abstractmethod
+    def write_item(self, item: ProductDetail) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def write_invalid(self, item: InvalidItem) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def write_failure(self, failure: CrawlError) -> None:
+        raise NotImplementedError
+
+    def write_skipped(self, stub: ProductStub) -> None:
+        # Stubs left unfetched when a time budget ran out; sinks that don't care drop them.
+        return None
+
+    def close(self) -> None:
+        return None
+
+    def __enter__(self) -> ResultSink:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class MemoryResultSink(ResultSink):
+    def __init__(self) -> None:
+        self.items: list[ProductDetail] = []
+        self.invalid_items: list[InvalidItem] = []
+        self.failures: list[CrawlError] = []
+        self.skipped: list[ProductStub] = []
+
+    def write_item(self, item: ProductDetail) -> None:
+        self.items.append(item)
+
+    def write_invalid(self, item: InvalidItem) -> None:
+        self.invalid_items.append(item)
+
+    def write_failure(self, failure: CrawlError) -> None:
+        self.failures.append(failure)
+
+    def write_skipped(self, stub: ProductStub) -> None:
+        self.skipped.append(stub)
+
+    def result(self) -> CrawlResult:
+        return CrawlResult(
+            items=self.items,
+            invalid_items=self.invalid_items,
+            failures=self.failures,
+            skipped=self.skipped,
+        )
+
+
+class FileResultSink(ResultSink):
+    """Appends each outcome to the usual output files and flushes it immediately.
+
+    Only counters are kept in memory, so a crash mid-run leaves every row written so far on disk.
+    When `keep_urls` is given (resuming a run), rows already on disk for those product URLs are
+    carried over and everything else, including a torn last line, is discarded.
+    """
+
+    def __init__(self, out_dir: Path, keep_urls: set[str] | None = None) -> None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.results_jsonl = out_dir / "results.jsonl"
+        self.results_csv = out_dir / "results.csv"
+        self.failed_jsonl = out_dir / "failed.jsonl"
+        self.invalid_jsonl = out_dir / "invalid.jsonl"
+        self.invalid_csv = out_dir / "invalid.csv"
+        self.skipped_jsonl = out_dir / "skipped.jsonl"
+        self.item_count = 0
+        self.invalid_count = 0
+        self.failure_count = 0
+        self.skipped_count = 0
+
+        previous_items: list[ProductDetail] = []
+        previous_invalid: list[InvalidItem] = []
+        previous_failures: list[CrawlError] = []
+        if keep_urls is not None:
+            previous_items = _read_previous(self.results_jsonl, ProductDetail, keep_urls)
+            previous_invalid = _read_previous(self.invalid_jsonl, InvalidItem, keep_urls)
+            previous_failures = _read_previous(self.failed_jsonl, CrawlError, keep_urls)
+
+        self._results_jsonl_file = self.results_jsonl.open("w", encoding="utf-8")
+        self._failed_jsonl_file = self.failed_jsonl.open("w", encoding="utf-8")
+        self._invalid_jsonl_file = self.invalid_jsonl.open("w", encoding="utf-8")
+        # Skipped stubs stay unfinished in the journal, so each run rewrites this list from scratch.
+        self._skipped_jsonl_file = self.skipped_jsonl.open("w", encoding="utf-8")
+        self._results_csv_file = self.results_csv.open("w", newline="", encoding="utf-8-sig")
+        self._invalid_csv_file = self.invalid_csv.open("w", newline="", encoding="utf-8-sig")
+        self._results_csv = csv.DictWriter(self._results_csv_file, fieldnames=RESULT_CSV_FIELDS)
+        self._invalid_csv = csv.DictWriter(self._invalid_csv_file, fieldnames=INVALID_CSV_FIELDS)
+        self._results_csv.writeheader()
+        self._invalid_csv.writeheader()
+        self._results_csv_file.flush()
+        self._invalid_csv_file.flush()
+
+        for item in previous_items:
+            self.write_item(item)
+        for invalid in previous_invalid:
+            self.write_invalid(invalid)
+        for failure in previous_failures:
+            self.write_failure(failure)
+
+    def write_item(self, item: ProductDetail) -> None:
+        self._results_jsonl_file.write(to_jsonl_line(item))
+        self._results_jsonl_file.flush()
+        self._results_csv.writerow(to_result_csv_row(item))
+        self._results_csv_file.flush()
+        self.item_count += 1
+
+    def write_invalid(self, item: InvalidItem) -> None:
+        self._invalid_jsonl_file.write(to_jsonl_line(item))
+        self._invalid_jsonl_file.flush()
+        self._invalid_csv.writerow(to_invalid_csv_row(item))
+        self._invalid_csv_file.flush()
+        self.invalid_count += 1
+
+    def write_failure(self, failure: CrawlError) -> None:
+        self._failed_jsonl_file.write(to_jsonl_line(failure))
+        self._failed_jsonl_file.flush()
+        self.failure_count += 1
+
+    def write_skipped(self, stub: ProductStub) -> None:
+        self._skipped_jsonl_file.write(to_jsonl_line(stub))
+        self._skipped_jsonl_file.flush()
+        self.skipped_count += 1
+
+    def log_summary(self) -> None:
+        logger.info("saved %s items to %s", self.item_count, self.results_jsonl)
+        logger.info("saved %s items to %s", self.item_count, self.results_csv)
+        logger.info("saved %s failures to %s", self.failure_count, self.failed_jsonl)
+        logger.info("saved %s invalid items to %s", self.invalid_count, self.invalid_jsonl)
+        logger.info("saved %s invalid items to %s", self.invalid_count, self.invalid_csv)
+        if self.skipped_count:
+            logger.info("saved %s skipped items to %s", self.skipped_count, self.skipped_jsonl)
+
+    def close(self) -> None:
+        for handle in (
+            self._results_jsonl_file,
+            self._results_csv_file,
+            self._failed_jsonl_file,
+            self._invalid_jsonl_file,
+            self._invalid_csv_file,
+            self._skipped_jsonl_file,
+        ):
+            handle.close()
+
+
+def _read_previous(path: Path, model: type[ModelT], keep_urls: set[str]) -> list[ModelT]:
+    if not path.exists():
+        return []
+    rows: list[ModelT] = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = model.model_validate(json.loads(line))
+            except (json.JSONDecodeError, ValidationError):
+                continue
+            if str(getattr(row, "product_url", "")) in keep_urls:
+                rows.append(row)
+    return rows
@@ -3,89 +3,115 @@ from __future__ import annotations
 import csv
 import json
 from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
 
 from app.models import CrawlError, InvalidItem, ProductDetail, model_to_row
 
+RESULT_CSV_FIELDS = [
+    "site",
+    "country",
+    "title",
+    "price_jpy",
+    "review_count",
+    "seller_badge",
+    "search_position",
+    "monthly_sold_count",
+    "is_bestseller",
+    "bestseller_rank",
+    "validity",
+    "usage_validity",
+    "activation_validity",
+    "network_type",
+    "carrier_support_local",
+    "carrier_support_kr",
+    "data_amount",
+    "product_url",
+    "asin",
+    "site_product_id",
+    "seller",
+    "brand",
+    "evidence",
+    "fetched_at",
+    "search_signature",
+]
+
+INVALID_CSV_FIELDS = [
+    "site",
+    "country",
+    "title",
+    "price_jpy",
+    "search_price_jpy",
+    "invalid_reason",
+    "product_url",
+    "asin",
+    "site_product_id",
+    "raw_price_texts",
+    "evidence",
+]
+
+
+def to_jsonl_line(model: BaseModel) -> str:
+    return json.dumps(model_to_row(model), ensure_ascii=False) + "\n"
+
+
+def to_result_csv_row(item: ProductDetail) -> dict[str, Any]:
+    row = model_to_row(item)
+    row["carrier_support_local"] = json.dumps(row["carrier_support_local"], ensure_ascii=False)
+    row["carrier_support_kr"] = json.dumps(row["carrier_support_kr"], ensure_ascii=False)
+    row["evidence"] = json.dumps(row["evidence"], ensure_ascii=False)
+    return row
+
+
+def to_invalid_csv_row(item: InvalidItem) -> dict[str, Any]:
+    row = model_to_row(item)
+    row["raw_price_texts"] = json.dumps(row["raw_price_texts"], ensure_ascii=False)
+    row["evidence"] = json.dumps(row["evidence"], ensure_ascii=False)
+    return row
+
 
 def write_jsonl(path: Path, items: list[ProductDetail]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as f:
         for item in items:
-            f.write(json.dumps(model_to_row(item), ensure_ascii=False) + "\n")
+            f.write(to_jsonl_line(item))
 
 
 def write_csv(path: Path, items: list[ProductDetail]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    fieldnames = [
-        "site",
-        "country",
-        "title",
-        "price_jpy",
-        "review_count",
-        "seller_badge",
-        "search_position",
-        "monthly_sold_count",
-        "is_bestseller",
-        "bestseller_rank",
-        "validity",
-        "usage_validity",
-        "activation_validity",
-        "network_type",
-        "carrier_support_local",
-        "carrier_support_kr",
-        "data_amount",
-        "product_url",
-        "asin",
-        "site_product_id",
-        "seller",
-        "brand",
-        "evidence",
-    ]
     with path.open("w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=RESULT_CSV_FIELDS)
         writer.writeheader()
         for item in items:
-            row = model_to_row(item)
-            row["carrier_support_local"] = json.dumps(row["carrier_support_local"], ensure_ascii=False)
-            row["carrier_support_kr"] = json.dumps(row["carrier_support_kr"], ensure_ascii=False)
-            row["evidence"] = json.dumps(row["evidence"], ensure_ascii=False)
-            writer.writerow(row)
+            writer.writerow(to_result_csv_row(item))
 
 
 def write_failed_jsonl(path: Path, failures: list[CrawlError]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as f:
         for failure in failures:
-            f.write(json.dumps(model_to_row(failure), ensure_ascii=False) + "\n")
+            f.write(to_jsonl_line(failure))
 
 
 def write_invalid_jsonl(path: Path, items: list[InvalidItem]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as f:
         for item in items:
-            f.write(json.dumps(model_to_row(item), ensure_ascii=False) + "\n")
+            f.write(to_jsonl_line(item))
 
 
 def write_invalid_csv(path: Path, items: list[InvalidItem]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    fieldnames = [
-        "site",
-        "country",
-        "title",
-        "price_jpy",
-        "search_price_jpy",
-        "invalid_reason",
-        "product_url",
-        "asin",
-        "site_product_id",
-        "raw_price_texts",
-        "evidence",
-    ]
     with path.open("w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=INVALID_CSV_FIELDS)
         writer.writeheader()
         for item in items:
-            row = model_to_row(item)
-            row["raw_price_texts"] = json.dumps(row["raw_price_texts"], ensure_ascii=False)
-            row["evidence"] = json.dumps(row["evidence"], ensure_ascii=False)
-            writer.writerow(row)
+            writer.writerow(to_invalid_csv_row(item))
+
+
+def write_run_stats(path: Path, stats: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+        f.write("\n")
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Circuit:
+    consecutive_blocks: int = 0
+    opened_until: float | None = None
+    probe: object | None = None
+    probe_done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class CircuitBreaker:
+    """Per-host breaker for robot-check / CAPTCHA pages.
+
+    After `threshold` consecutive blocked pages the host opens for `cooldown` seconds and nothing
+    passes `guard()`. Afterwards exactly one request goes through as a probe: a clean page closes
+    the circuit, another block opens it for a fresh cool-down.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        cooldown: float = 120.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._sleep = sleep
+        self._circuits: dict[str, _Circuit] = {}
+        self.trips = 0
+
+    def is_open(self, url: str) -> bool:
+        circuit = self._circuits.get(_host(url))
+        return circuit is not None and circuit.opened_until is not None
+
+    @asynccontextmanager
+    async def guard(self, url: str) -> AsyncIterator[None]:
+        host = _host(url)
+        circuit = self._circuits.setdefault(host, _Circuit())
+        token = object()
+        while circuit.opened_until is not None:
+            remaining = circuit.opened_until - self._clock()
+            if remaining > 0:
+                await self._sleep(remaining)
+            elif circuit.probe is None:
+                circuit.probe = token
+                circuit.probe_done = asyncio.Event()
+                logger.info("circuit half-open for %s: probing with one request", host)
+                break
+            else:
+                await circuit.probe_done.wait()
+        try:
+            yield
+        finally:
+            # A probe that ended without a verdict (timeout, cancel) lets the next waiter probe.
+            if circuit.probe is token:
+                _end_probe(circuit)
+
+    def record_success(self, url: str) -> None:
+        host = _host(url)
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            return
+        circuit.consecutive_blocks = 0
+        if circuit.opened_until is not None:
+            logger.info("circuit closed for %s", host)
+            circuit.opened_until = None
+        _end_probe(circuit)
+
+    def record_block(self, url: str) -> None:
+        host = _host(url)
+        circuit = self._circuits.setdefault(host, _Circuit())
+        circuit.consecutive_blocks += 1
+        if circuit.probe is not None or circuit.consecutive_blocks >= self.threshold:
+            if circuit.opened_until is None:
+                self.trips += 1
+            circuit.opened_until = self._clock() + self.cooldown
+            logger.warning(
+                "circuit open for %s: %s consecutive blocked pages, pausing %.0fs",
+                host,
+                circuit.consecutive_blocks,
+                self.cooldown,
+            )
+        _end_probe(circuit)
+
+
+def _host(url: str) -> str:
+    return urlparse(url).hostname or url
+
+
+def _end_probe(circuit: _Circuit) -> None:
+    if circuit.probe is not None:
+        circuit.probe = None
+        circuit.probe_done.set()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import statistics
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LimitChange:
+    elapsed_seconds: float
+    limit: int
+    reason: str
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by detail-fetch latency, error rate and throttling signals.
+
+    Every `window` completed fetches the limit grows by one while p95 latency stays within
+    `latency_factor` x the baseline and the error rate stays under `max_error_rate`; otherwise
+    it is halved. The baseline is the median p50 of the last `baseline_windows` error-free
+    windows, so a burst of fast failures cannot pin it low and it follows a slower site.
+    A timeout or block page halves it immediately, at most once per typical request duration
+    so one burst of failures counts as one signal.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 16,
+        window: int = 10,
+        latency_factor: float = 2.5,
+        max_error_rate: float = 0.2,
+        baseline_windows: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(self.maximum, max(self.minimum, initial))
+        self.window = max(2, window)
+        self.latency_factor = latency_factor
+        self.max_error_rate = max_error_rate
+        self._clock = clock
+        self._started = clock()
+        self._active = 0
+        self._condition = asyncio.Condition()
+        self._latencies: list[float] = []
+        self._errors = 0
+        self._healthy_p50s: deque[float] = deque(maxlen=max(1, baseline_windows))
+        self._last_decrease = -math.inf
+        self._wake_task: asyncio.Task[None] | None = None
+        self.history: list[LimitChange] = [LimitChange(0.0, self.limit, "initial")]
+
+    async def __aenter__(self) -> AdaptiveLimiter:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def observe(self, latency: float, ok: bool, throttled: bool = False) -> None:
+        if throttled:
+            typical = self._baseline_p50() or latency
+            if self._clock() - self._last_decrease >= typical:
+                self._decrease("throttled")
+            self._reset_window()
+            return
+
+        self._latencies.append(latency)
+        if not ok:
+            self._errors += 1
+        if len(self._latencies) < self.window:
+            return
+
+        ordered = sorted(self._latencies)
+        p50 = ordered[len(ordered) // 2]
+        p95 = ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.95) - 1)]
+        error_rate = self._errors / len(self._latencies)
+        baseline = self._baseline_p50() or p50
+        if self._errors == 0:
+            self._healthy_p50s.append(p50)
+        self._reset_window()
+
+        if error_rate > self.max_error_rate:
+            self._decrease(f"error_rate={error_rate:.2f}")
+        elif p95 > baseline * self.latency_factor:
+            self._decrease(f"p95={p95:.1f}s")
+        elif self.limit < self.maximum:
+            self._set_limit(self.limit + 1, f"healthy p95={p95:.1f}s")
+
+    def _baseline_p50(self) -> float | None:
+        return statistics.median(self._healthy_p50s) if self._healthy_p50s else None
+
+    def _reset_window(self) -> None:
+        self._latencies.clear()
+        self._errors = 0
+
+    def _decrease(self, reason: str) -> None:
+        self._last_decrease = self._clock()
+        self._set_limit(max(self.minimum, self.limit // 2), reason)
+
+    def _set_limit(self, limit: int, reason: str) -> None:
+        if limit == self.limit:
+            return
+        logger.info("concurrency %s -> %s (%s)", self.limit, limit, reason)
+        raised = limit > self.limit
+        self.limit = limit
+        self.history.append(LimitChange(round(self._clock() - self._started, 2), limit, reason))
+        if raised:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._wake_task = loop.create_task(self._wake_waiters())
+
+    async def _wake_waiters(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+    def report(self) -> dict[str, object]:
+        limits = [change.limit for change in self.history]
+        return {
+            "final": self.limit,
+            "min": min(limits),
+            "max": max(limits),
+            "history": [
+                {
+                    "elapsed_seconds": change.elapsed_seconds,
+                    "limit": change.limit,
+                    "reason": change.reason,
+                }
+                for change in self.history
+            ],
+        }
@@ -2,14 +2,30 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import random
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import AbstractAsyncContextManager, AsyncExitStack, aclosing
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import Any
 
-from tenacity import AsyncRetrying, RetryError, stop_after_attempt, wait_exponential_jitter
-
-from app.adapters.base import MarketplaceAdapter
-from app.models import CrawlError, CrawlResult, InvalidItem, ProductDetail, ProductStub
+from app.adapters.base import (
+    BlockedPageError,
+    DetailFetchRecord,
+    MarketplaceAdapter,
+    track_detail_fetch,
+)
+from app.models import CrawlError, CrawlResult, ProductDetail, ProductStub
+from app.output.sinks import MemoryResultSink, ResultSink
+from app.output.writers import write_run_stats
+from app.pipeline.circuit import CircuitBreaker
+from app.pipeline.concurrency import AdaptiveLimiter
+from app.pipeline.incremental import PreviousResults, search_signature
+from app.pipeline.journal import CrawlJournal
 from app.pipeline.validation import validate_product
-from app.utils.delay import random_delay
+from app.utils.delay import HostRateLimiter
+from app.utils.loop_monitor import EventLoopLagMonitor
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +40,12 @@ class CrawlPipeline:
         max_delay: float = 3.0,
         max_retries: int = 3,
         detail_timeout: float = 90.0,
+        limiters: Sequence[AbstractAsyncContextManager[Any]] = (),
+        rate_limiter: HostRateLimiter | None = None,
+        time_budget: float | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        previous: PreviousResults | None = None,
+        loop_monitor: EventLoopLagMonitor | None = None,
     ) -> None:
         self.adapter = adapter
         self.out_dir = out_dir
@@ -32,72 +54,374 @@ class CrawlPipeline:
         self.max_delay = max_delay
         self.max_retries = max_retries
         self.detail_timeout = max(0.01, detail_timeout)
+        # Slots held around each detail fetch: an AdaptiveLimiter and/or shared caps from crawl-matrix.
+        # `concurrency` is the number of workers, i.e. the most any limiter can ever let through.
+        self.limiters = tuple(limiters)
+        self.adaptive_limiters = [limiter for limiter in self.limiters if isinstance(limiter, AdaptiveLimiter)]
+        self.stats_path = out_dir / "run_stats.json"
+        # min/max delay describe politeness per host; it is enforced at navigation time by the adapter.
+        self.rate_limiter = rate_limiter or HostRateLimiter.from_delays(min_delay, max_delay, self.concurrency)
+        # Blocked pages are requeued like other failures; repeated blocks also pause the whole host,
+        # and the worker waits out that cool-down before a retry takes a slot.
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        # Incremental mode: details whose search card is unchanged are carried over without a page visit.
+        self.previous = previous
+        # With a budget, no detail fetch starts unless its expected duration still fits before the deadline.
+        self.time_budget = time_budget
+        self.skipped_count = 0
+        # Set when the time budget stopped search itself, so later results were never read.
+        self.search_cut_short = False
+        self.retry_count = 0
+        self.finished_count = 0
+        self.loop_monitor = loop_monitor
+        # Adapter, rate-limit and breaker counters; crawl-matrix shares those across pairs, turns
+        # this off and reports them once in matrix_stats.json instead.
+        self.report_shared_stats = True
+        self._deadline: float | None = None
+        self._detail_estimate: float | None = None
 
     async def run(self, query: str, limit: int, country: str | None = None) -> CrawlResult:
-        stubs = await self.adapter.search(query=query, limit=limit)
-        if country:
-            stubs = [stub.model_copy(update={"country": country}) for stub in stubs]
-        logger.info("start crawl details: %s items", len(stubs))
-        semaphore = asyncio.Semaphore(self.concurrency)
-
-        items: list[ProductDetail] = []
-        invalid_items: list[InvalidItem] = []
-        failures: list[CrawlError] = []
-
-        async def worker(stub: ProductStub) -> None:
-            async with semaphore:
-                await random_delay(self.min_delay, self.max_delay)
-                try:
-                    item = await self._fetch_with_retry(stub)
-                    if country and item.country is None:
-                        item = item.model_copy(update={"country": country})
-                    invalid = validate_product(item, stub)
-                    if invalid is not None:
-                        logger.info("invalid item for %s: %s", stub.product_url, invalid.invalid_reason)
-                        invalid_items.append(invalid)
-                    else:
-                        items.append(item)
-                except Exception as exc:
-                    logger.warning("failed for %s: %s", stub.product_url, exc)
-                    screenshot = self._extract_screenshot_path(str(exc))
-                    failures.append(
-                        CrawlError(
-                            site=stub.site,
-                            country=stub.country or country,
-                            product_url=str(stub.product_url),
-                            asin=stub.asin,
-                            error_type=type(exc).__name__,
-                            error_message=str(exc),
-                            status_code=None,
-                            screenshot_path=screenshot,
-                        )
+        sink = MemoryResultSink()
+        await self.run_to_sink(sink, query=query, limit=limit, country=country)
+        return sink.result()
+
+    async def run_to_sink(
+        self,
+        sink: ResultSink,
+        query: str,
+        limit: int,
+        country: str | None = None,
+        journal: CrawlJournal | None = None,
+        stubs: AsyncIterator[ProductStub] | None = None,
+    ) -> None:
+        """Fetch details for search results, or for `stubs` when another process did the search."""
+        if self.rate_limiter is not None and self.adapter.rate_limiter is None:
+            self.adapter.rate_limiter = self.rate_limiter
+        if self.adapter.page_pool is not None:
+            # One idle page per worker; crawl-matrix targets sharing an adapter keep the largest.
+            self.adapter.page_pool.grow_to(self.concurrency)
+        started = time.monotonic()
+        self._deadline = None if self.time_budget is None else started + self.time_budget
+        # Detail workers start on the first stub while search is still paging. Entries sort by attempt,
+        # then search rank: fresh work goes before retries, and a time budget is spent on the top results.
+        queue: asyncio.PriorityQueue[tuple[float, float, int, ProductStub | None]] = asyncio.PriorityQueue(
+            maxsize=self.concurrency * 2
+        )
+        # Stubs queued, in flight or waiting out a retry delay; workers stop once search is done and this is 0.
+        pending = 0
+        search_done = False
+        retry_tasks: set[asyncio.Task[None]] = set()
+
+        def finish_one() -> None:
+            nonlocal pending
+            pending -= 1
+            stop_workers_if_idle()
+
+        def stop_workers_if_idle() -> None:
+            if search_done and pending == 0:
+                for index in range(self.concurrency):
+                    queue.put_nowait((float("inf"), float("inf"), index, None))
+
+        async def requeue_later(entry: tuple[float, float, int, ProductStub | None], delay: float) -> None:
+            await asyncio.sleep(delay)
+            await queue.put(entry)
+
+        async def produce() -> None:
+            nonlocal pending, search_done
+            queued = 0
+            skipped = 0
+            try:
+                if stubs is not None:
+                    source = stubs
+                else:
+                    source = iter_search_stubs(self.adapter, query=query, limit=limit, country=country, journal=journal)
+                async with aclosing(source) as source_stubs:
+                    async for stub in source_stubs:
+                        if journal is not None and journal.is_finished(str(stub.product_url)):
+                            skipped += 1
+                            continue
+                        if self._budget_spent():
+                            logger.info("time budget spent, stopping search after %s items", queued)
+                            sink.write_skipped(stub)
+                            self.skipped_count += 1
+                            self.search_cut_short = True
+                            break
+                        position = stub.search_position if stub.search_position is not None else queued + 1
+                        pending += 1
+                        await queue.put((1, float(position), queued, stub))
+                        queued += 1
+            finally:
+                search_done = True
+                stop_workers_if_idle()
+            if skipped:
+                logger.info("skipped %s items already finished in journal", skipped)
+            logger.info("search finished: %s items queued for details", queued)
+
+        async def worker() -> None:
+            while (entry := await queue.get())[3] is not None:
+                attempt, position, seq, stub = entry
+                if self.previous is not None and (carried := self.previous.reuse(stub)) is not None:
+                    outcome = self._write_detail(carried, stub, sink=sink, country=country)
+                    if journal is not None:
+                        journal.record_finished(str(stub.product_url), outcome)
+                    self.finished_count += 1
+                    finish_one()
+                    continue
+                async with AsyncExitStack() as stack:
+                    # Wait out an open circuit before taking a concurrency slot.
+                    await stack.enter_async_context(self.circuit_breaker.guard(str(stub.product_url)))
+                    for limiter in self.limiters:
+                        await stack.enter_async_context(limiter)
+                    if self._budget_spent(self._detail_estimate or 0.0):
+                        sink.write_skipped(stub)
+                        self.skipped_count += 1
+                        finish_one()
+                        continue
+                    fetch_started = time.monotonic()
+                    done = await self._process_stub(
+                        stub,
+                        attempt=int(attempt),
+                        sink=sink,
+                        country=country,
+                        journal=journal,
                     )
+                    self._update_estimate(time.monotonic() - fetch_started)
+                if done:
+                    self.finished_count += 1
+                    finish_one()
+                    continue
+                if self._budget_spent():
+                    # Left unfinished in the journal, so a later --resume retries it.
+                    sink.write_skipped(stub)
+                    self.skipped_count += 1
+                    finish_one()
+                    continue
+                # The slot is already released; the retry waits its backoff outside the worker pool.
+                self.retry_count += 1
+                retry = (attempt + 1, position, seq, stub)
+                task = asyncio.create_task(requeue_later(retry, self._retry_delay(int(attempt))))
+                retry_tasks.add(task)
+                task.add_done_callback(retry_tasks.discard)
+
+        logger.info("start crawl: search and details overlap with %s workers", self.concurrency)
+        if self.loop_monitor is not None:
+            self.loop_monitor.start()
+        tasks = [asyncio.create_task(produce())]
+        tasks.extend(asyncio.create_task(worker()) for _ in range(self.concurrency))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in [*tasks, *retry_tasks]:
+                task.cancel()
+            if self.loop_monitor is not None:
+                await self.loop_monitor.stop()
+        if self.skipped_count:
+            logger.warning("time budget reached: %s items left for a later --resume", self.skipped_count)
+        if self.search_cut_short:
+            logger.warning("time budget reached during search: later search results were not read")
+        self._write_stats(elapsed=time.monotonic() - started)
+
+    def _retry_delay(self, attempt: int) -> float:
+        # Same curve as the old inline wait_exponential_jitter(initial=1, max=8).
+        return min(8.0, 2.0 ** (attempt - 1)) + random.uniform(0, 1)
 
-        await asyncio.gather(*(worker(stub) for stub in stubs))
-        return CrawlResult(items=items, invalid_items=invalid_items, failures=failures)
+    def _budget_spent(self, expected_seconds: float = 0.0) -> bool:
+        return self._deadline is not None and time.monotonic() + expected_seconds > self._deadline
 
-    async def _fetch_with_retry(self, stub: ProductStub) -> ProductDetail:
+    def _update_estimate(self, seconds: float) -> None:
+        if self._detail_estimate is None:
+            self._detail_estimate = seconds
+        else:
+            self._detail_estimate = 0.7 * self._detail_estimate + 0.3 * seconds
+
+    def _write_stats(self, elapsed: float) -> None:
+        stats: dict[str, Any] = {
+            "elapsed_seconds": round(elapsed, 2),
+            "workers": self.concurrency,
+            "details_finished": self.finished_count,
+            "details_per_minute": round(self.finished_count / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        }
+        if self.loop_monitor is not None:
+            stats["event_loop_lag"] = self.loop_monitor.report()
+            logger.info(
+                "event loop lag: %s, %.1f details/min",
+                stats["event_loop_lag"],
+                stats["details_per_minute"],
+            )
+        if self.report_shared_stats:
+            stats.update(shared_stats(self.adapter, self.rate_limiter, self.circuit_breaker))
+        if self.previous is not None:
+            stats["incremental"] = {"previous_records": len(self.previous), "reused": self.previous.reused}
+            logger.info("incremental: reused %s of %s previous records", self.previous.reused, len(self.previous))
+        if self.retry_count:
+            stats["retries"] = self.retry_count
+        if self.time_budget is not None:
+            stats["time_budget"] = {
+                "seconds": self.time_budget,
+                "skipped": self.skipped_count,
+                "search_cut_short": self.search_cut_short,
+                "detail_estimate_seconds": round(self._detail_estimate or 0.0, 2),
+            }
+        if self.adaptive_limiters:
+            report = self.adaptive_limiters[0].report()
+            stats["concurrency"] = report
+            logger.info(
+                "adaptive concurrency: final=%s range=%s..%s over %s changes",
+                report["final"],
+                report["min"],
+                report["max"],
+                len(report["history"]) - 1,
+            )
+        write_run_stats(self.stats_path, stats)
+
+    async def _process_stub(
+        self,
+        stub: ProductStub,
+        attempt: int,
+        sink: ResultSink,
+        country: str | None,
+        journal: CrawlJournal | None,
+    ) -> bool:
+        """Run one attempt; returns False when the stub should be requeued for another."""
+        outcome: str | None
         try:
-            async for attempt in AsyncRetrying(
-                stop=stop_after_attempt(self.max_retries),
-                wait=wait_exponential_jitter(initial=1, max=8),
-                reraise=True,
-            ):
-                with attempt:
-                    try:
-                        return await asyncio.wait_for(
-                            self.adapter.fetch_detail(stub),
-                            timeout=self.detail_timeout,
-                        )
-                    except TimeoutError as exc:
-                        raise RuntimeError(
-                            f"detail fetch timed out after {self.detail_timeout:.0f}s"
-                        ) from exc
-        except RetryError as retry_error:
-            raise retry_error.last_attempt.exception() or retry_error
+            item = await self._fetch_once(stub)
+            item = item.model_copy(
+                update={"fetched_at": datetime.now(UTC), "search_signature": search_signature(stub)}
+            )
+            outcome = self._write_detail(item, stub, sink=sink, country=country)
+        except Exception as exc:
+            if attempt < self.max_retries:
+                logger.info("attempt %s failed for %s: %s", attempt, stub.product_url, exc)
+                return False
+            logger.warning("failed for %s after %s attempts: %s", stub.product_url, attempt, exc)
+            screenshot = self._extract_screenshot_path(str(exc))
+            sink.write_failure(
+                CrawlError(
+                    site=stub.site,
+                    country=stub.country or country,
+                    product_url=str(stub.product_url),
+                    asin=stub.asin,
+                    error_type=type(exc).__name__,
+                    error_message=str(exc),
+                    status_code=exc.status_code if isinstance(exc, BlockedPageError) else None,
+                    screenshot_path=screenshot,
+                    attempts=attempt,
+                )
+            )
+            if isinstance(exc, BlockedPageError):
+                # Journaled but left unfinished, so --resume tries the URL again.
+                if journal is not None:
+                    journal.record_blocked(str(stub.product_url))
+                return True
+            outcome = "failed"
+        if journal is not None:
+            journal.record_finished(str(stub.product_url), outcome)
+        return True
+
+    def _write_detail(self, item: ProductDetail, stub: ProductStub, sink: ResultSink, country: str | None) -> str:
+        if country and item.country is None:
+            item = item.model_copy(update={"country": country})
+        invalid = validate_product(item, stub)
+        if invalid is not None:
+            logger.info("invalid item for %s: %s", stub.product_url, invalid.invalid_reason)
+            sink.write_invalid(invalid)
+            return "invalid"
+        sink.write_item(item)
+        return "item"
+
+    async def _fetch_once(self, stub: ProductStub) -> ProductDetail:
+        started = time.monotonic()
+        with track_detail_fetch() as record:
+            try:
+                detail = await asyncio.wait_for(self.adapter.fetch_detail(stub), timeout=self.detail_timeout)
+            except BlockedPageError:
+                self._observe(record, started, ok=False, throttled=True)
+                # A memo hit re-raises the block of the one page load every country shared.
+                if not record.from_cache:
+                    self.circuit_breaker.record_block(str(stub.product_url))
+                raise
+            except TimeoutError as exc:
+                self._observe(record, started, ok=False, throttled=True)
+                raise RuntimeError(f"detail fetch timed out after {self.detail_timeout:.0f}s") from exc
+            except Exception:
+                self._observe(record, started, ok=False)
+                raise
+            self._observe(record, started, ok=True)
+        if not record.from_cache:
+            self.circuit_breaker.record_success(str(stub.product_url))
+        return detail
+
+    def _observe(self, record: DetailFetchRecord, started: float, ok: bool, throttled: bool = False) -> None:
+        # Cache and memo hits finish in milliseconds and say nothing about the site's latency.
+        if record.from_cache:
+            return
+        # Waiting for a rate-limit token is our own pacing; counting it would shrink concurrency
+        # exactly when the host limit, not the site, is the bottleneck.
+        latency = max(0.0, time.monotonic() - started - record.rate_limit_wait)
+        for limiter in self.adaptive_limiters:
+            limiter.observe(latency, ok=ok, throttled=throttled)
 
     def _extract_screenshot_path(self, message: str) -> str | None:
         marker = "screenshot="
         if marker not in message:
             return None
         return message.split(marker, 1)[-1].strip()
+
+
+def shared_stats(
+    adapter: MarketplaceAdapter,
+    rate_limiter: HostRateLimiter | None,
+    circuit_breaker: CircuitBreaker | None,
+) -> dict[str, Any]:
+    """Run-stats sections for state that outlives one pipeline: adapter counters, pacing, breaker."""
+    stats: dict[str, Any] = {}
+    if rate_limiter is not None:
+        stats["rate_limit"] = {
+            "requests_per_second_per_host": round(rate_limiter.rate, 3),
+            "waited_seconds": round(rate_limiter.waited_seconds, 2),
+        }
+    if adapter.page_pool is not None:
+        pool = adapter.page_pool
+        stats["page_pool"] = {"created": pool.created, "reused": pool.reused, "discarded": pool.discarded}
+    if adapter.resource_blocker is not None:
+        stats["resources"] = adapter.resource_blocker.report()
+    if adapter.fetch_paths is not None:
+        stats["fetch_paths"] = dict(adapter.fetch_paths)
+    if adapter.page_cache is not None:
+        stats["page_cache"] = {"hits": adapter.page_cache.hits, "misses": adapter.page_cache.misses}
+    if adapter.detail_pages is not None:
+        stats["detail_pages"] = {"loaded": adapter.detail_pages.misses, "reused": adapter.detail_pages.hits}
+    if circuit_breaker is not None and circuit_breaker.trips:
+        stats["circuit_breaker"] = {
+            "trips": circuit_breaker.trips,
+            "threshold": circuit_breaker.threshold,
+            "cooldown_seconds": circuit_breaker.cooldown,
+        }
+    return stats
+
+
+async def iter_search_stubs(
+    adapter: MarketplaceAdapter,
+    query: str,
+    limit: int,
+    country: str | None,
+    journal: CrawlJournal | None,
+) -> AsyncIterator[ProductStub]:
+    """Search results for one target, replayed from the journal first when resuming."""
+    if journal is not None:
+        if journal.search_complete:
+            logger.info("reusing %s journaled search results", len(journal.stubs))
+        for stub in list(journal.stubs):
+            yield stub
+        if journal.search_complete:
+            return
+
+    async for stub in adapter.iter_search(query=query, limit=limit):
+        if country:
+            stub = stub.model_copy(update={"country": country})
+        if journal is not None and not journal.record_stub(stub):
+            continue
+        yield stub
+    if journal is not None:
+        journal.record_search_complete()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+
+from pydantic import BaseModel
+
+from app.adapters.base import BlockedPageError, MarketplaceAdapter
+from app.models import CrawlError, InvalidItem, ProductDetail, ProductStub
+from app.output.sinks import FileResultSink, ResultSink
+from app.output.writers import write_run_stats
+from app.pipeline.crawler import CrawlPipeline, iter_search_stubs
+from app.pipeline.jobqueue import JobQueue, JobResult
+from app.pipeline.journal import CrawlJournal
+from app.pipeline.matrix import CrawlTarget
+
+logger = logging.getLogger(__name__)
+
+
+class QueueResultSink(ResultSink):
+    """Posts a worker's outcomes back to the job queue instead of writing output files."""
+
+    def __init__(self, queue: JobQueue, worker: str) -> None:
+        self.queue = queue
+        self.worker = worker
+        # product URL -> job id for stubs this worker has leased and not yet posted.
+        self.leases: dict[str, int] = {}
+        self.posted = 0
+        self.released = 0
+        self.lost = 0
+
+    def write_item(self, item: ProductDetail) -> None:
+        self._post(str(item.product_url), "item", item)
+
+    def write_invalid(self, item: InvalidItem) -> None:
+        self._post(item.product_url, "invalid", item)
+
+    def write_failure(self, failure: CrawlError) -> None:
+        if failure.error_type != BlockedPageError.__name__:
+            self._post(failure.product_url, "failed", failure)
+            return
+        # A block is about this worker's IP/session, so another worker gets a turn at the page.
+        job_id = self.leases.pop(failure.product_url, None)
+        if job_id is not None and self.queue.release(job_id, self.worker, failure):
+            self.released += 1
+
+    def _post(self, product_url: str, outcome: str, payload: BaseModel) -> None:
+        job_id = self.leases.pop(product_url, None)
+        if job_id is None:
+            logger.warning("no lease held for %s, result dropped", product_url)
+            return
+        if self.queue.complete(job_id, self.worker, outcome, payload):
+            self.posted += 1
+        else:
+            self.lost += 1
+            logger.warning("lease for %s expired before its result was posted", product_url)
+
+
+async def leased_stubs(queue: JobQueue, sink: QueueResultSink, poll_interval: float) -> AsyncIterator[ProductStub]:
+    """Lease one job at a time until the coordinator's search is done and no job is open."""
+    while True:
+        leases = await asyncio.to_thread(queue.lease, sink.worker, 1)
+        for lease in leases:
+            sink.leases[str(lease.stub.product_url)] = lease.job_id
+            yield lease.stub
+        if leases:
+            continue
+        if await asyncio.to_thread(queue.is_drained):
+            return
+        await asyncio.sleep(poll_interval)
+
+
+async def run_worker(
+    pipeline: CrawlPipeline,
+    queue: JobQueue,
+    worker: str,
+    poll_interval: float = 2.0,
+) -> QueueResultSink:
+    run_info = queue.run_info
+    sink = QueueResultSink(queue, worker)
+    logger.info("worker %s: taking jobs from %s", worker, queue.path)
+    await pipeline.run_to_sink(
+        sink,
+        query=run_info["query"],
+        limit=run_info["limit"],
+        country=run_info["country"],
+        stubs=leased_stubs(queue, sink, poll_interval),
+    )
+    logger.info(
+        "worker %s finished: %s results posted, %s blocked jobs released, %s lost to expired leases",
+        worker,
+        sink.posted,
+        sink.released,
+        sink.lost,
+    )
+    return sink
+
+
+async def run_coordinator(
+    adapter: MarketplaceAdapter,
+    queue: JobQueue,
+    target: CrawlTarget,
+    limit: int,
+    journal: CrawlJournal,
+    poll_interval: float = 2.0,
+) -> FileResultSink:
+    """Search on this host, queue the details for crawl-worker processes and assemble their results."""
+    started = time.monotonic()
+    keep_urls = set(journal.finished) if journal.finished else None
+    if reopened := queue.reopen_blocked():
+        logger.info("re-queued %s jobs that were blocked in the previous run", reopened)
+    search = asyncio.create_task(_enqueue_search(adapter, queue, target, limit, journal))
+    try:
+        with FileResultSink(target.out_dir, keep_urls=keep_urls) as sink:
+            seq = 0
+            while True:
+                searched = search.done()
+                if searched:
+                    search.result()
+                await asyncio.to_thread(queue.expire_exhausted)
+                seq = await _collect(queue, seq, sink, journal)
+                if searched and await asyncio.to_thread(queue.is_drained):
+                    break
+                await asyncio.sleep(poll_interval)
+            # Results posted between the last collect and the drain check.
+            await _collect(queue, seq, sink, journal)
+    finally:
+        search.cancel()
+        journal.close()
+
+    counts = queue.counts()
+    write_run_stats(
+        target.out_dir / "run_stats.json",
+        {
+            "elapsed_seconds": round(time.monotonic() - started, 2),
+            "job_queue": {"path": str(queue.path), "jobs": sum(counts.values()), "reissued": queue.reissued_count()},
+        },
+    )
+    sink.log_summary()
+    return sink
+
+
+async def _enqueue_search(
+    adapter: MarketplaceAdapter,
+    queue: JobQueue,
+    target: CrawlTarget,
+    limit: int,
+    journal: CrawlJournal,
+) -> None:
+    queued = 0
+    async for stub in iter_search_stubs(adapter, query=target.query, limit=limit, country=target.country, journal=journal):
+        if journal.is_finished(str(stub.product_url)):
+            continue
+        position = stub.search_position if stub.search_position is not None else queued + 1
+        await asyncio.to_thread(queue.enqueue, stub, float(position))
+        queued += 1
+    await asyncio.to_thread(queue.mark_search_complete)
+    logger.info("search finished: %s items queued for workers", queued)
+
+
+async def _collect(queue: JobQueue, seq: int, sink: FileResultSink, journal: CrawlJournal) -> int:
+    for result in await asyncio.to_thread(queue.results_after, seq):
+        seq = result.seq
+        _apply_result(result, sink, journal)
+    return seq
+
+
+def _apply_result(result: JobResult, sink: FileResultSink, journal: CrawlJournal) -> None:
+    if journal.is_finished(result.product_url):
+        # Already carried over by the sink when resuming.
+        return
+    if result.outcome == "item":
+        sink.write_item(ProductDetail.model_validate(result.payload))
+    elif result.outcome == "invalid":
+        sink.write_invalid(InvalidItem.model_validate(result.payload))
+    else:
+        sink.write_failure(CrawlError.model_validate(result.payload))
+    # Blocked jobs stay unfinished so --resume queues them again.
+    if result.outcome == "blocked":
+        journal.record_blocked(result.product_url)
+    else:
+        journal.record_finished(result.product_url, result.outcome)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from app.models import ProductDetail, ProductStub
+
+logger = logging.getLogger(__name__)
+
+
+def search_signature(stub: ProductStub) -> str | None:
+    values = [
+        stub.search_price_jpy,
+        stub.search_review_count,
+        stub.search_monthly_sold_count,
+        stub.search_is_bestseller,
+    ]
+    if all(value is None for value in values):
+        return None
+    return hashlib.sha1(json.dumps(values).encode("utf-8")).hexdigest()[:16]
+
+
+def product_key(item: ProductStub | ProductDetail) -> str:
+    return item.site_product_id or item.asin or str(item.product_url)
+
+
+class PreviousResults:
+    """Details from the last published run, reused when the search card has not changed.
+
+    A previous record is carried forward only if its `search_signature` equals the new stub's and
+    it was fetched less than `max_age` ago; records written before signatures existed never match.
+    """
+
+    def __init__(self, items: list[ProductDetail], max_age: timedelta, now: datetime | None = None) -> None:
+        self.max_age = max_age
+        self.now = now or datetime.now(UTC)
+        self._items = {product_key(item): item for item in items}
+        self.reused = 0
+
+    @classmethod
+    def load(cls, path: Path, max_age: timedelta) -> PreviousResults:
+        items: list[ProductDetail] = []
+        if path.exists():
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        items.append(ProductDetail.model_validate(json.loads(line)))
+                    except (json.JSONDecodeError, ValidationError):
+                        continue
+        logger.info("incremental: %s previous records from %s", len(items), path)
+        return cls(items, max_age=max_age)
+
+    @classmethod
+    def from_dashboard(cls, data_dir: Path, site: str, country: str, max_age: timedelta) -> PreviousResults:
+        return cls.load(data_dir / "sites" / site / country / "latest.jsonl", max_age=max_age)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def reuse(self, stub: ProductStub) -> ProductDetail | None:
+        previous = self._items.get(product_key(stub))
+        signature = search_signature(stub)
+        if previous is None or signature is None or previous.search_signature != signature:
+            return None
+        if previous.fetched_at is None or self.now - _as_utc(previous.fetched_at) > self.max_age:
+            return None
+        self.reused += 1
+        evidence = dict(previous.evidence)
+        evidence["carried_forward"] = [f"unchanged search card, detail fetched at {previous.fetched_at.isoformat()}"]
+        return previous.model_copy(
+            update={
+                "country": stub.country or previous.country,
+                "search_position": stub.search_position,
+                "product_url": stub.product_url,
+                "evidence": evidence,
+            }
+        )
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
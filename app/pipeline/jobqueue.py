@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.models import CrawlError, ProductStub, model_to_row
+
+logger = logging.getLogger(__name__)
+
+# Job outcomes; "blocked" is a failure that stays unfinished in the coordinator's journal.
+OUTCOMES = ("item", "invalid", "failed", "blocked")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    position REAL NOT NULL,
+    stub TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    outcome TEXT,
+    result TEXT,
+    finished_seq INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_lease ON jobs (status, position, id);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_seq);
+"""
+
+
+@dataclass(frozen=True)
+class Lease:
+    job_id: int
+    stub: ProductStub
+    attempts: int
+
+
+@dataclass(frozen=True)
+class JobResult:
+    seq: int
+    product_url: str
+    outcome: str
+    payload: dict[str, Any]
+
+
+class JobQueue:
+    """Detail-fetch jobs in a SQLite file shared by one coordinator and any number of workers.
+
+    A worker leases a job for `lease_seconds`; if it has not posted a result by then the job is
+    handed to the next worker that asks. After `max_attempts` leases a job is closed as failed.
+    Lease deadlines use wall-clock time, so hosts sharing the file need roughly synced clocks.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lease_seconds: float = 600.0,
+        max_attempts: int = 3,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._lock = threading.Lock()
+        # Autocommit; writes take the database lock up front with BEGIN IMMEDIATE.
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def create(
+        cls,
+        path: Path,
+        run_info: dict[str, Any],
+        lease_seconds: float = 600.0,
+        max_attempts: int = 3,
+    ) -> JobQueue:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)
+        queue = cls(path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+        with queue._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("run", json.dumps(run_info)),
+                    ("lease_seconds", json.dumps(lease_seconds)),
+                    ("max_attempts", json.dumps(max_attempts)),
+                    ("search_complete", "false"),
+                ],
+            )
+        return queue
+
+    @classmethod
+    def open(cls, path: Path) -> JobQueue:
+        if not path.exists():
+            raise FileNotFoundError(f"no job queue found at {path}")
+        queue = cls(path)
+        meta = queue._meta()
+        if "run" not in meta:
+            raise ValueError(f"{path} is not a crawl job queue")
+        queue.lease_seconds = float(meta["lease_seconds"])
+        queue.max_attempts = int(meta["max_attempts"])
+        return queue
+
+    @property
+    def run_info(self) -> dict[str, Any]:
+        return self._meta()["run"]
+
+    @property
+    def search_complete(self) -> bool:
+        return bool(self._meta().get("search_complete"))
+
+    def _meta(self) -> dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM meta").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, stub: ProductStub, position: float) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs (url, position, stub) VALUES (?, ?, ?)",
+                (str(stub.product_url), position, json.dumps(model_to_row(stub), ensure_ascii=False)),
+            )
+        return cursor.rowcount > 0
+
+    def mark_search_complete(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("UPDATE meta SET value = 'true' WHERE key = 'search_complete'")
+
+    def lease(self, worker: str, limit: int = 1) -> list[Lease]:
+        now = self.clock()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, stub, attempts FROM jobs
+                WHERE status = 'queued'
+                   OR (status = 'leased' AND lease_expires <= ? AND attempts < ?)
+                ORDER BY attempts, position, id
+                LIMIT ?
+                """,
+                (now, self.max_attempts, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                [(worker, now + self.lease_seconds, job_id) for job_id, _, _ in rows],
+            )
+        leases = [
+            Lease(job_id=job_id, stub=ProductStub.model_validate(json.loads(stub)), attempts=attempts + 1)
+            for job_id, stub, attempts in rows
+        ]
+        reissued = sum(1 for lease in leases if lease.attempts > 1)
+        if reissued:
+            logger.info("re-issued %s jobs whose lease expired", reissued)
+        return leases
+
+    def complete(self, job_id: int, worker: str, outcome: str, payload: BaseModel) -> bool:
+        """Post a result; returns False if the lease was lost to another worker in the meantime."""
+        if outcome not in OUTCOMES:
+            raise ValueError(f"unknown job outcome '{outcome}'")
+        with self._transaction() as conn:
+            return self._finish(conn, job_id, worker, outcome, model_to_row(payload))
+
+    def release(self, job_id: int, worker: str, failure: CrawlError) -> bool:
+        """Hand a blocked job to another worker; closes it as blocked once attempts run out."""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND status = 'leased' AND worker = ?",
+                (job_id, worker),
+            ).fetchone()
+            if row is None:
+                return False
+            if row[0] >= self.max_attempts:
+                return self._finish(conn, job_id, worker, "blocked", model_to_row(failure))
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, lease_expires = NULL WHERE id = ?",
+                (job_id,),
+            )
+        return True
+
+    def _finish(
+        self,
+        conn: sqlite3.Connection,
+        job_id: int,
+        worker: str | None,
+        outcome: str,
+        payload: dict[str, Any],
+    ) -> bool:
+        cursor = conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'done', outcome = ?, result = ?, lease_expires = NULL,
+                finished_seq = (SELECT COALESCE(MAX(finished_seq), 0) + 1 FROM jobs)
+            WHERE id = ? AND status = 'leased' AND worker IS ?
+            """,
+            (outcome, json.dumps(payload, ensure_ascii=False), job_id, worker),
+        )
+        return cursor.rowcount > 0
+
+    def expire_exhausted(self) -> int:
+        """Close jobs whose last allowed lease expired, e.g. a page that keeps killing workers."""
+        now = self.clock()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, stub, attempts, worker FROM jobs WHERE status = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                (now, self.max_attempts),
+            ).fetchall()
+            for job_id, stub_json, attempts, worker in rows:
+                stub = ProductStub.model_validate(json.loads(stub_json))
+                failure = CrawlError(
+                    site=stub.site,
+                    country=stub.country,
+                    product_url=str(stub.product_url),
+                    asin=stub.asin,
+                    error_type="LeaseExpired",
+                    error_message=f"no result after {attempts} leases of {self.lease_seconds:.0f}s",
+                    attempts=attempts,
+                )
+                self._finish(conn, job_id, worker, "failed", model_to_row(failure))
+        return len(rows)
+
+    def reopen_blocked(self) -> int:
+        """Queue blocked jobs again with fresh attempts, for a resumed coordinator."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'queued', attempts = 0, worker = NULL, outcome = NULL, result = NULL,
+                    finished_seq = NULL
+                WHERE status = 'done' AND outcome = 'blocked'
+                """
+            )
+        return cursor.rowcount
+
+    def results_after(self, seq: int) -> list[JobResult]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT finished_seq, url, outcome, result FROM jobs WHERE finished_seq > ? ORDER BY finished_seq",
+                (seq,),
+            ).fetchall()
+        return [
+            JobResult(seq=row_seq, product_url=url, outcome=outcome, payload=json.loads(result))
+            for row_seq, url, outcome, result in rows
+        ]
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {"queued": 0, "leased": 0, "done": 0, **dict(rows)}
+
+    def reissued_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE attempts > 1").fetchone()[0]
+
+    def is_drained(self) -> bool:
+        counts = self.counts()
+        return self.search_complete and counts["queued"] == 0 and counts["leased"] == 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
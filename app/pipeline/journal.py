@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+from app.models import ProductStub, model_to_row
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILENAME = "journal.jsonl"
+FINISHED_EVENTS = ("item", "invalid", "failed")
+# Gave up within a run but worth another try: kept out of `finished` so --resume refetches it.
+BLOCKED_EVENT = "blocked"
+
+
+class JournalMismatchError(ValueError):
+    pass
+
+
+class CrawlJournal:
+    """Append-only record of search stubs and finished product URLs for one `--out` directory."""
+
+    def __init__(self, path: Path, run_info: dict[str, Any]) -> None:
+        self.path = path
+        self.run_info = run_info
+        self.stubs: list[ProductStub] = []
+        self.search_complete = False
+        self.finished: dict[str, str] = {}
+        self.blocked: set[str] = set()
+        self._stub_urls: set[str] = set()
+        self._file = None
+
+    @classmethod
+    def start(cls, out_dir: Path, site: str, country: str, query: str, limit: int) -> CrawlJournal:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        journal = cls(out_dir / JOURNAL_FILENAME, _run_info(site, country, query, limit))
+        journal._file = journal.path.open("w", encoding="utf-8")
+        journal._append({"event": "run", **journal.run_info})
+        return journal
+
+    @classmethod
+    def resume(cls, out_dir: Path, site: str, country: str, query: str, limit: int) -> CrawlJournal:
+        path = out_dir / JOURNAL_FILENAME
+        if not path.exists():
+            raise FileNotFoundError(f"no crawl journal found at {path}")
+        journal = cls(path, _run_info(site, country, query, limit))
+        journal._load()
+        journal._file = path.open("a", encoding="utf-8")
+        logger.info(
+            "resuming crawl: %s journaled stubs (search %s), %s finished items, %s blocked to retry",
+            len(journal.stubs),
+            "complete" if journal.search_complete else "incomplete",
+            len(journal.finished),
+            len(journal.blocked - journal.finished.keys()),
+        )
+        return journal
+
+    def _load(self) -> None:
+        with self.path.open("r", encoding="utf-8") as f:
+            lines = f.readlines()
+        if lines and not lines[-1].endswith("\n"):
+            # A torn final line from a hard crash is dropped so appends start on a clean line.
+            lines = lines[:-1]
+            with self.path.open("w", encoding="utf-8") as f:
+                f.writelines(lines)
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            event = record.get("event")
+            if event == "run":
+                recorded = {key: record.get(key) for key in self.run_info}
+                if recorded != self.run_info:
+                    raise JournalMismatchError(
+                        f"journal at {self.path} was written for {recorded}, not {self.run_info}"
+                    )
+            elif event == "stub":
+                stub = ProductStub.model_validate(record["stub"])
+                self._remember_stub(stub)
+            elif event == "search_complete":
+                self.search_complete = True
+            elif event in FINISHED_EVENTS:
+                self.finished[record["product_url"]] = event
+            elif event == BLOCKED_EVENT:
+                self.blocked.add(record["product_url"])
+
+    def _remember_stub(self, stub: ProductStub) -> bool:
+        url = str(stub.product_url)
+        if url in self._stub_urls:
+            return False
+        self._stub_urls.add(url)
+        self.stubs.append(stub)
+        return True
+
+    def _append(self, record: dict[str, Any]) -> None:
+        if self._file is None:
+            raise RuntimeError("journal is closed")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def record_stub(self, stub: ProductStub) -> bool:
+        if not self._remember_stub(stub):
+            return False
+        self._append({"event": "stub", "stub": model_to_row(stub)})
+        return True
+
+    def record_search_complete(self) -> None:
+        self.search_complete = True
+        self._append({"event": "search_complete"})
+
+    def record_finished(self, product_url: str, event: str) -> None:
+        if event not in FINISHED_EVENTS:
+            raise ValueError(f"unknown journal event '{event}'")
+        self.finished[product_url] = event
+        self._append({"event": event, "product_url": product_url})
+
+    def record_blocked(self, product_url: str) -> None:
+        self.blocked.add(product_url)
+        self._append({"event": BLOCKED_EVENT, "product_url": product_url})
+
+    def is_finished(self, product_url: str) -> bool:
+        return product_url in self.finished
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _run_info(site: str, country: str, query: str, limit: int) -> dict[str, Any]:
+    return {"site": site, "country": country, "query": query, "limit": limit}
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.adapters.base import MarketplaceAdapter
+from app.adapters.browser_pool import BrowserPool
+from app.adapters.factory import create_adapter
+from app.adapters.page_cache import DetailPageCache
+from app.adapters.page_memo import DetailPageMemo
+from app.output.sinks import FileResultSink
+from app.output.writers import write_run_stats
+from app.pipeline.concurrency import AdaptiveLimiter
+from app.pipeline.crawler import CrawlPipeline, shared_stats
+from app.pipeline.journal import CrawlJournal
+
+logger = logging.getLogger(__name__)
+
+MATRIX_STATS_FILENAME = "matrix_stats.json"
+
+
+@dataclass(frozen=True)
+class CrawlTarget:
+    site: str
+    country: str
+    query: str
+    out_dir: Path
+
+
+PipelineFactory = Callable[
+    [MarketplaceAdapter, CrawlTarget, Sequence[AbstractAsyncContextManager[Any]]],
+    CrawlPipeline,
+]
+
+
+def open_journal(target: CrawlTarget, limit: int, resume: bool) -> CrawlJournal:
+    kwargs = {"site": target.site, "country": target.country, "query": target.query, "limit": limit}
+    if resume:
+        try:
+            return CrawlJournal.resume(target.out_dir, **kwargs)
+        except FileNotFoundError:
+            logger.info("no journal for %s/%s, starting fresh", target.site, target.country)
+    return CrawlJournal.start(target.out_dir, **kwargs)
+
+
+async def run_target(
+    pipeline: CrawlPipeline,
+    target: CrawlTarget,
+    limit: int,
+    journal: CrawlJournal,
+) -> FileResultSink:
+    keep_urls = set(journal.finished) if journal.finished else None
+    try:
+        with FileResultSink(target.out_dir, keep_urls=keep_urls) as sink:
+            await pipeline.run_to_sink(
+                sink,
+                query=target.query,
+                limit=limit,
+                country=target.country,
+                journal=journal,
+            )
+    finally:
+        journal.close()
+
+    sink.log_summary()
+    return sink
+
+
+async def run_matrix(
+    targets: Sequence[CrawlTarget],
+    limit: int,
+    out_root: Path,
+    site_concurrency: int,
+    global_concurrency: int,
+    pipeline_factory: PipelineFactory,
+    resume: bool = False,
+    adaptive_initial: int | None = None,
+    page_cache: DetailPageCache | None = None,
+    parse_executor: Executor | None = None,
+    block_resources: bool = True,
+    in_page_extraction: bool = False,
+    http_fast_path: bool = False,
+) -> dict[CrawlTarget, BaseException | None]:
+    """Crawl every target in one event loop, sharing one adapter per site and one browser overall.
+
+    Detail fetches are bounded per site by `site_concurrency` and across all sites by
+    `global_concurrency`. With `adaptive_initial` set, each site's cap is an AdaptiveLimiter
+    starting there and growing up to `site_concurrency`. A site crawled for several countries
+    loads each product page once and re-parses it per country. A failing target is reported
+    without stopping the others.
+    """
+    global_slots = asyncio.Semaphore(max(1, global_concurrency))
+    sites = list(dict.fromkeys(target.site for target in targets))
+    adapters: dict[str, MarketplaceAdapter] = {}
+    outcomes: dict[CrawlTarget, BaseException | None] = {}
+    site_pipelines: dict[str, CrawlPipeline] = {}
+    # Sites get separate contexts in one Chromium; it closes with the last adapter.
+    browser_pool = BrowserPool()
+    try:
+        for site in sites:
+            adapters[site] = await create_adapter(
+                site=site,
+                screenshot_dir=out_root / site / "screenshots",
+                pool=browser_pool,
+                block_resources=block_resources,
+            )
+            adapters[site].page_cache = page_cache
+            adapters[site].parse_executor = parse_executor
+            adapters[site].in_page_extraction = in_page_extraction
+            if http_fast_path:
+                adapters[site].open_http_client()
+            if sum(target.site == site for target in targets) > 1:
+                adapters[site].detail_pages = DetailPageMemo()
+        site_slots: dict[str, AbstractAsyncContextManager[Any]] = {}
+        for site in sites:
+            if adaptive_initial is None:
+                site_slots[site] = asyncio.Semaphore(max(1, site_concurrency))
+            else:
+                site_slots[site] = AdaptiveLimiter(initial=adaptive_initial, maximum=site_concurrency)
+
+        async def crawl_one(target: CrawlTarget) -> None:
+            journal = open_journal(target, limit=limit, resume=resume)
+            pipeline = pipeline_factory(
+                adapters[target.site],
+                target,
+                (site_slots[target.site], global_slots),
+            )
+            # Counters of the shared adapter would repeat in every pair's run_stats.json.
+            pipeline.report_shared_stats = False
+            site_pipelines.setdefault(target.site, pipeline)
+            logger.info("matrix start: %s/%s query=%s", target.site, target.country, target.query)
+            await run_target(pipeline, target, limit=limit, journal=journal)
+
+        results = await asyncio.gather(*(crawl_one(target) for target in targets), return_exceptions=True)
+        write_run_stats(
+            out_root / MATRIX_STATS_FILENAME,
+            {
+                "sites": {
+                    site: shared_stats(adapters[site], pipeline.rate_limiter, pipeline.circuit_breaker)
+                    for site, pipeline in site_pipelines.items()
+                }
+            },
+        )
+        for target, result in zip(targets, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error("matrix target %s/%s failed: %s", target.site, target.country, result)
+                outcomes[target] = result
+            else:
+                outcomes[target] = None
+    finally:
+        for site, adapter in adapters.items():
+            if adapter.detail_pages is not None:
+                logger.info(
+                    "%s detail pages: %s loaded, %s reused across countries",
+                    site,
+                    adapter.detail_pages.misses,
+                    adapter.detail_pages.hits,
+                )
+            await adapter.close()
+    return outcomes
@@ -1,4 +1,5 @@
-from .delay import random_delay
+from .delay import HostRateLimiter
 from .logging import configure_logging
+from .loop_monitor import EventLoopLagMonitor
 
-__all__ = ["random_delay", "configure_logging"]
+__all__ = ["HostRateLimiter", "configure_logging", "EventLoopLagMonitor"]
@@ -1,8 +1,72 @@
 from __future__ import annotations
 
-import random
 import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated: float
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class HostRateLimiter:
+    """Per-host token bucket: `rate` requests/second with `burst` tokens of headroom.
+
+    Each wait for a token is stretched by a random factor in [1 - jitter, 1 + jitter] so
+    requests do not arrive on a fixed beat. Waiters for the same host are served in order.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        jitter: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: dict[str, _Bucket] = {}
+        self.waited_seconds = 0.0
+
+    @classmethod
+    def from_delays(cls, min_delay: float, max_delay: float, concurrency: int) -> HostRateLimiter | None:
+        # Same ceiling as the old "every slot sleeps min..max seconds before a request" pacing.
+        mean_delay = (min_delay + max_delay) / 2
+        if mean_delay <= 0:
+            return None
+        spread = (max_delay - min_delay) / (max_delay + min_delay)
+        return cls(rate=max(1, concurrency) / mean_delay, jitter=spread)
+
+    async def acquire(self, url: str) -> None:
+        host = urlparse(url).hostname or url
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _Bucket(tokens=float(self.burst), updated=self._clock())
 
+        async with bucket.lock:
+            self._refill(bucket)
+            if bucket.tokens < 1:
+                wait = (1 - bucket.tokens) / self.rate
+                wait *= random.uniform(1 - self.jitter, 1 + self.jitter)
+                self.waited_seconds += wait
+                await self._sleep(wait)
+                self._refill(bucket)
+                bucket.tokens = max(bucket.tokens, 1.0)
+            bucket.tokens -= 1
 
-async def random_delay(min_seconds: float, max_seconds: float) -> None:
-    await asyncio.sleep(random.uniform(min_seconds, max_seconds))
+    def _refill(self, bucket: _Bucket) -> None:
+        now = self._clock()
+        bucket.tokens = min(float(self.burst), bucket.tokens + (now - bucket.updated) * self.rate)
+        bucket.updated = now
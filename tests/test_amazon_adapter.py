@@ -1,6 +1,10 @@
+import asyncio
+
+import pytest
 from bs4 import BeautifulSoup
 
 from app.adapters.amazon_jp import AmazonJPAdapter
+from app.adapters.base import BlockedPageError
 from app.extractors.heuristics import extract_review_count
 def test_amazon_search_card_extracts_review_count():
     html = """
@@ -82,3 +86,91 @@ def test_amazon_extract_carrier_support_kr_for_kr_country():
     assert support.kt is True
     assert support.lgu is True
     assert evidence
+
+
+def test_amazon_detects_robot_check_page():
+    html = """
+    <html>
+      <head><title>Amazon.co.jp</title></head>
+      <body>
+        <h4>ご迷惑をおかけしています。お客様がロボットでないことを確認させていただくため、文字を入力してください。</h4>
+        <form method="get" action="/errors/validateCaptcha">
+          <input id="captchacharacters" name="field-keywords" type="text">
+        </form>
+      </body>
+    </html>
+    """
+    adapter = object.__new__(AmazonJPAdapter)
+
+    with pytest.raises(BlockedPageError):
+        adapter._raise_if_blocked("https://www.amazon.co.jp/dp/B000000001", html)
+
+    product = "<html><head><title>韓国 eSIM</title></head><body><span id='productTitle'>韓国 eSIM</span></body></html>"
+    adapter._raise_if_blocked("https://www.amazon.co.jp/dp/B000000001", product)
+
+
+def _search_pages(pages: dict[int, list[str]], delays: dict[int, float] | None = None):
+    requested: list[int] = []
+
+    async def fetch(url: str) -> str:
+        page_no = int(url.rsplit("page=", 1)[1])
+        requested.append(page_no)
+        await asyncio.sleep((delays or {}).get(page_no, 0))
+        asins = pages.get(page_no, pages[max(pages)])
+        cards = "".join(
+            f'<div data-component-type="s-search-result" data-asin="{asin}"><h2><a href="/dp/{asin}">x</a></h2></div>'
+            for asin in asins
+        )
+        return f"<html><head><title>eSIM</title></head><body>{cards}</body></html>"
+
+    return fetch, requested
+
+
+def _search(adapter: AmazonJPAdapter, limit: int) -> list:
+    async def main() -> list:
+        return [stub async for stub in adapter.iter_search("eSIM", limit=limit)]
+
+    return asyncio.run(main())
+
+
+def test_amazon_search_pages_past_ten_and_stops_when_results_repeat():
+    pages = {no: [f"B{no:03d}{i:06d}" for i in range(40)] for no in range(1, 13)}
+    adapter = object.__new__(AmazonJPAdapter)
+    adapter._fetch_search_html, requested = _search_pages(pages)
+
+    stubs = _search(adapter, limit=5000)
+
+    assert len(stubs) == 12 * 40
+    assert len({stub.asin for stub in stubs}) == len(stubs)
+    assert stubs[-1].search_position == 480
+    assert requested[:13] == list(range(1, 14))
+    assert len(requested) < 13 + AmazonJPAdapter.search_page_concurrency
+
+
+def test_amazon_search_merges_concurrent_pages_in_page_order():
+    pages = {
+        1: ["B000000001", "B000000002"],
+        2: ["B000000002", "B000000003"],
+        3: ["B000000004"],
+    }
+    adapter = object.__new__(AmazonJPAdapter)
+    adapter.search_cards_per_page = 1
+    # Later pages finish first.
+    adapter._fetch_search_html, requested = _search_pages(pages, delays={1: 0.03, 2: 0.02, 3: 0.01})
+
+    stubs = _search(adapter, limit=4)
+
+    assert [stub.asin for stub in stubs] == ["B000000001", "B000000002", "B000000003", "B000000004"]
+    assert [stub.search_position for stub in stubs] == [1, 2, 3, 4]
+    assert requested == [1, 2, 3]
+
+
+def test_amazon_search_fetches_one_page_when_it_covers_the_limit():
+    pages = {no: [f"B{no:03d}{i:06d}" for i in range(40)] for no in range(1, 4)}
+    adapter = object.__new__(AmazonJPAdapter)
+    adapter._fetch_search_html, requested = _search_pages(pages)
+
+    stubs = _search(adapter, limit=20)
+
+    assert len(stubs) == 20
+    assert requested == [1]
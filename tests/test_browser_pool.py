@@ -0,0 +1,69 @@
+import asyncio
+
+from app.adapters import browser_pool
+from app.adapters.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, options: dict) -> None:
+        self.options = options
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def new_context(self, **options) -> FakeContext:
+        return FakeContext(options)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self) -> None:
+        self.browsers: list[FakeBrowser] = []
+        self.stopped = 0
+        self.chromium = self
+
+    async def start(self) -> "FakePlaywright":
+        return self
+
+    async def launch(self, headless: bool) -> FakeBrowser:
+        self.browsers.append(FakeBrowser())
+        return self.browsers[-1]
+
+    async def stop(self) -> None:
+        self.stopped += 1
+
+
+def test_browser_pool_launches_once_and_closes_with_last_context(monkeypatch):
+    playwright = FakePlaywright()
+    monkeypatch.setattr(browser_pool, "async_playwright", lambda: playwright)
+    pool = BrowserPool()
+
+    async def main() -> None:
+        amazon, qoo10 = await asyncio.gather(pool.new_context(locale="ja-JP"), pool.new_context(locale="ja-JP"))
+        assert pool.launches == 1
+        assert pool.active_contexts == 2
+
+        await pool.release(amazon)
+        assert amazon.closed
+        assert not playwright.browsers[0].closed
+
+        await pool.release(qoo10)
+        assert playwright.browsers[0].closed
+        assert playwright.stopped == 1
+
+        # A later adapter relaunches rather than reusing the closed browser.
+        context = await pool.new_context()
+        await pool.release(context)
+
+    asyncio.run(main())
+
+    assert pool.launches == 2
+    assert pool.active_contexts == 0
@@ -0,0 +1,75 @@
+import asyncio
+
+from app.pipeline.circuit import CircuitBreaker
+
+URL = "https://www.amazon.co.jp/dp/B000000001"
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+def test_circuit_opens_after_consecutive_blocks():
+    breaker = CircuitBreaker(threshold=3, cooldown=30.0, clock=FakeTime().clock)
+
+    breaker.record_block(URL)
+    breaker.record_block(URL)
+    breaker.record_success(URL)
+    breaker.record_block(URL)
+    breaker.record_block(URL)
+    assert not breaker.is_open(URL)
+
+    breaker.record_block(URL)
+    assert breaker.is_open(URL)
+    assert not breaker.is_open("https://www.qoo10.jp/item/ESIM/1133241666")
+    assert breaker.trips == 1
+
+
+def test_circuit_lets_one_probe_through_after_cooldown():
+    fake = FakeTime()
+    breaker = CircuitBreaker(threshold=1, cooldown=30.0, clock=fake.clock, sleep=fake.sleep)
+    order: list[str] = []
+
+    async def main() -> None:
+        probing = asyncio.Event()
+        release = asyncio.Event()
+
+        async def probe() -> None:
+            async with breaker.guard(URL):
+                order.append("probe")
+                probing.set()
+                await release.wait()
+                breaker.record_block(URL)
+
+        async def follower() -> None:
+            async with breaker.guard(URL):
+                order.append("follower")
+                breaker.record_success(URL)
+
+        breaker.record_block(URL)
+        probe_task = asyncio.create_task(probe())
+        await probing.wait()
+        follower_task = asyncio.create_task(follower())
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert order == ["probe"]
+
+        release.set()
+        await asyncio.gather(probe_task, follower_task)
+
+    asyncio.run(main())
+
+    # The probe was blocked again, so the follower waited a second cool-down and probed itself.
+    assert order == ["probe", "follower"]
+    assert fake.sleeps == [30.0, 30.0]
+    assert not breaker.is_open(URL)
@@ -0,0 +1,104 @@
+import asyncio
+from dataclasses import fields
+from pathlib import Path
+
+import typer
+from typer.testing import CliRunner
+
+import app.cli as cli
+
+
+def test_crawl_commands_share_the_fetch_options():
+    commands = typer.main.get_command(cli.app).commands
+
+    for name in ("crawl", "crawl-worker", "crawl-matrix"):
+        params = {param.name for param in commands[name].params}
+        assert {field.name for field in fields(cli.FetchOptions)} <= params
+
+
+def test_fetch_options_reach_the_worker_as_one_object(monkeypatch):
+    captured = {}
+
+    async def fake_run_worker(**kwargs):
+        captured.update(kwargs)
+
+    class FakeQueue:
+        def close(self) -> None:
+            pass
+
+    monkeypatch.setattr(cli.JobQueue, "open", lambda path: FakeQueue())
+    monkeypatch.setattr(cli, "_run_worker", fake_run_worker)
+
+    result = CliRunner().invoke(
+        cli.app,
+        ["crawl-worker", "--queue-db", "jobs.sqlite", "--concurrency", "4", "--fixed-concurrency", "--rate", "2"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert captured["fetch"].concurrency == 4
+    assert captured["fetch"].adaptive is False
+    assert captured["fetch"].rate == 2.0
+    assert captured["max_concurrency"] == 12
+
+
+class FakeCoordinatorAdapter:
+    rate_limiter = None
+    http_client = None
+    closed = False
+
+    def open_http_client(self) -> None:
+        self.http_client = "pooled"
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_coordinator_adapter_is_paced_and_uses_the_http_fast_path(tmp_path: Path, monkeypatch):
+    adapter = FakeCoordinatorAdapter()
+    searched = []
+
+    async def fake_create_adapter(**kwargs):
+        return adapter
+
+    async def fake_run_coordinator(adapter_, queue, target, limit, journal):
+        searched.append((adapter_.rate_limiter, adapter_.http_client))
+
+    monkeypatch.setattr(cli, "create_adapter", fake_create_adapter)
+    monkeypatch.setattr(cli, "run_coordinator", fake_run_coordinator)
+    journal = cli.CrawlJournal.start(tmp_path, site="amazon_jp", country="kr", query="eSIM", limit=5)
+    fetch = cli.FetchOptions(
+        concurrency=3,
+        adaptive=True,
+        min_delay=1.0,
+        max_delay=3.0,
+        rate=2.0,
+        max_retries=3,
+        detail_timeout=90.0,
+        block_threshold=3,
+        block_cooldown=120.0,
+        page_cache=None,
+        page_cache_ttl_hours=12.0,
+        page_cache_max_mb=1024,
+        parse_workers=0,
+        in_page_extraction=False,
+        block_resources=True,
+        http_fast_path=True,
+    )
+
+    asyncio.run(cli._run_coordinator("amazon_jp", tmp_path, 5, queue=None, journal=journal, fetch=fetch))
+    journal.close()
+
+    [(rate_limiter, http_client)] = searched
+    assert rate_limiter is not None and rate_limiter.rate == 2.0
+    assert http_client == "pooled"
+    assert adapter.closed
+
+
+def test_queue_mode_rejects_a_detail_page_cache(tmp_path: Path):
+    result = CliRunner().invoke(
+        cli.app,
+        ["crawl", "--out", str(tmp_path), "--queue-db", str(tmp_path / "jobs.sqlite"), "--page-cache", str(tmp_path)],
+    )
+
+    assert result.exit_code != 0
+    assert not (tmp_path / "jobs.sqlite").exists()
@@ -0,0 +1,99 @@
+import asyncio
+
+from app.pipeline.concurrency import AdaptiveLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_adaptive_limiter_grows_while_healthy():
+    limiter = AdaptiveLimiter(initial=2, maximum=4, window=4, clock=FakeClock())
+
+    for _ in range(12):
+        limiter.observe(1.0, ok=True)
+
+    assert limiter.limit == 4
+    assert [change.limit for change in limiter.history] == [2, 3, 4]
+
+
+def test_adaptive_limiter_halves_on_throttle_once_per_burst():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=8, maximum=8, window=4, clock=clock)
+    for _ in range(4):
+        limiter.observe(2.0, ok=True)
+
+    limiter.observe(90.0, ok=False, throttled=True)
+    limiter.observe(90.0, ok=False, throttled=True)
+    assert limiter.limit == 4
+
+    clock.now += 5.0
+    limiter.observe(90.0, ok=False, throttled=True)
+    assert limiter.limit == 2
+    assert limiter.report()["min"] == 2
+
+
+def test_adaptive_limiter_backs_off_on_latency_and_errors():
+    limiter = AdaptiveLimiter(initial=6, maximum=8, window=4, clock=FakeClock())
+    for _ in range(4):
+        limiter.observe(1.0, ok=True)
+    assert limiter.limit == 7
+
+    for _ in range(4):
+        limiter.observe(5.0, ok=True)
+    assert limiter.limit == 3
+
+    for ok in (False, False, True, True):
+        limiter.observe(1.0, ok=ok)
+    assert limiter.limit == 1
+
+
+def test_adaptive_limiter_baseline_ignores_a_fast_error_burst():
+    limiter = AdaptiveLimiter(initial=6, maximum=8, window=10, clock=FakeClock())
+    for _ in range(10):
+        limiter.observe(0.05, ok=False)
+    assert limiter.limit == 3
+
+    for _ in range(60):
+        limiter.observe(3.0, ok=True)
+
+    assert limiter.limit == 8
+    assert all(not change.reason.startswith("p95") for change in limiter.history)
+
+
+def test_adaptive_limiter_baseline_follows_a_slower_site():
+    limiter = AdaptiveLimiter(initial=4, maximum=16, window=4, baseline_windows=3, clock=FakeClock())
+    for _ in range(8):
+        limiter.observe(1.0, ok=True)
+    for _ in range(4):
+        limiter.observe(4.0, ok=True)
+    assert limiter.history[-1].reason == "p95=4.0s"
+
+    for _ in range(16):
+        limiter.observe(4.0, ok=True)
+
+    assert limiter.history[-1].reason == "healthy p95=4.0s"
+
+
+def test_adaptive_limiter_bounds_active_slots():
+    limiter = AdaptiveLimiter(initial=2, maximum=4)
+    active = 0
+    peak = 0
+
+    async def job() -> None:
+        nonlocal active, peak
+        async with limiter:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def main() -> None:
+        await asyncio.gather(*(job() for _ in range(8)))
+
+    asyncio.run(main())
+    assert peak == 2
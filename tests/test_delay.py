@@ -0,0 +1,77 @@
+import asyncio
+
+from app.adapters.base import track_detail_fetch
+from app.adapters.qoo10_jp import Qoo10JPAdapter
+from app.utils.delay import HostRateLimiter
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_host_rate_limiter_spaces_requests_per_host():
+    fake = FakeTime()
+    limiter = HostRateLimiter(rate=2.0, burst=1, clock=fake.clock, sleep=fake.sleep)
+
+    async def main() -> None:
+        for _ in range(3):
+            await limiter.acquire("https://www.amazon.co.jp/dp/B000000001")
+        await limiter.acquire("https://www.qoo10.jp/item/ESIM/1133241666")
+
+    asyncio.run(main())
+
+    assert fake.sleeps == [0.5, 0.5]
+    assert fake.now == 1.0
+    assert limiter.waited_seconds == 1.0
+
+
+def test_host_rate_limiter_refills_while_idle():
+    fake = FakeTime()
+    limiter = HostRateLimiter(rate=1.0, burst=2, clock=fake.clock, sleep=fake.sleep)
+
+    async def main() -> None:
+        await limiter.acquire("https://www.qoo10.jp/item/a")
+        await limiter.acquire("https://www.qoo10.jp/item/b")
+        fake.now += 5.0
+        await limiter.acquire("https://www.qoo10.jp/item/c")
+        await limiter.acquire("https://www.qoo10.jp/item/d")
+
+    asyncio.run(main())
+
+    assert fake.sleeps == []
+
+
+def test_rate_limiter_from_delays_matches_old_slot_pacing():
+    limiter = HostRateLimiter.from_delays(1.0, 3.0, concurrency=3)
+
+    assert limiter is not None
+    assert limiter.rate == 1.5
+    assert limiter.jitter == 0.5
+    assert HostRateLimiter.from_delays(0, 0, concurrency=3) is None
+
+
+def test_adapter_records_rate_limit_wait_for_the_current_fetch():
+    class FakePage:
+        async def goto(self, url: str, **kwargs):
+            return None
+
+    adapter = object.__new__(Qoo10JPAdapter)
+    adapter.rate_limiter = HostRateLimiter(rate=20.0)
+    url = "https://www.qoo10.jp/item/ESIM/1133241666"
+
+    async def main() -> float:
+        await adapter._goto(FakePage(), url)
+        with track_detail_fetch() as record:
+            await adapter._goto(FakePage(), url)
+        return record.rate_limit_wait
+
+    assert asyncio.run(main()) >= 0.04
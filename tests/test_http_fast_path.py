@@ -0,0 +1,106 @@
+import asyncio
+from collections import Counter
+
+import httpx
+
+from app.adapters.amazon_jp import AmazonJPAdapter
+from app.adapters.qoo10_jp import Qoo10JPAdapter
+from app.models import ProductStub
+
+ITEM_URL = "https://www.qoo10.jp/item/ESIM/1133241666"
+ITEM_HTML = """
+<html>
+  <head><meta name="description" content="「韓国 eSIM 3日間 無制限」 スマートフォン・タブレットPCがお得な[Qoo10]"></head>
+  <body>
+    <div id="goods_info"><div class="price">980円</div></div>
+  </body>
+</html>
+"""
+
+
+def _adapter(handler) -> Qoo10JPAdapter:
+    adapter = object.__new__(Qoo10JPAdapter)
+    adapter.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    adapter.fetch_paths = Counter()
+
+    async def browser_fetch(stub: ProductStub) -> str:
+        return "<html>browser</html>"
+
+    adapter._fetch_detail_html_browser = browser_fetch
+    return adapter
+
+
+def _fetch(adapter: Qoo10JPAdapter) -> str:
+    stub = ProductStub(site="qoo10_jp", product_url=ITEM_URL, site_product_id="1133241666")
+
+    async def main() -> str:
+        try:
+            return await adapter.fetch_detail_html(stub)
+        finally:
+            await adapter._close_http_client()
+
+    return asyncio.run(main())
+
+
+def test_server_rendered_item_page_skips_the_browser():
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, text=ITEM_HTML)
+
+    adapter = _adapter(handler)
+
+    assert _fetch(adapter) == ITEM_HTML
+    assert adapter.fetch_paths == Counter({"http": 1})
+    assert str(requests[0].url) == ITEM_URL
+
+
+def test_block_status_block_page_and_missing_selectors_fall_back_to_the_browser():
+    responses = [
+        httpx.Response(403, text="Forbidden"),
+        httpx.Response(200, text="<html><title>Attention Required! | Cloudflare</title><body></body></html>"),
+        httpx.Response(200, text="<html><body><div id='goods_info'>loading</div></body></html>"),
+    ]
+    for response in responses:
+        adapter = _adapter(lambda request, response=response: response)
+
+        assert _fetch(adapter) == "<html>browser</html>"
+        assert adapter.fetch_paths == Counter({"browser": 1})
+
+
+def test_amazon_search_uses_http_and_falls_back_on_a_robot_check():
+    def card(asin: str) -> str:
+        return f'<div data-component-type="s-search-result" data-asin="{asin}"><h2><a href="/dp/{asin}">x</a></h2></div>'
+
+    cookies: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        cookies.append(request.headers.get("cookie", ""))
+        if request.url.params["page"] == "2":
+            return httpx.Response(200, text="<html><title>Robot Check</title><body></body></html>")
+        return httpx.Response(200, text=f"<html><body>{card('B000000001')}</body></html>")
+
+    adapter = object.__new__(AmazonJPAdapter)
+    adapter.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler), cookies=adapter.http_cookies)
+    adapter.fetch_paths = Counter()
+    browser_urls: list[str] = []
+
+    async def browser_fetch(url: str) -> str:
+        browser_urls.append(url)
+        return f"<html><body>{card('B000000002')}</body></html>"
+
+    adapter._fetch_search_html_browser = browser_fetch
+
+    async def main() -> list:
+        try:
+            return [stub async for stub in adapter.iter_search("eSIM", limit=2)]
+        finally:
+            await adapter._close_http_client()
+
+    stubs = asyncio.run(main())
+
+    assert [stub.asin for stub in stubs] == ["B000000001", "B000000002"]
+    assert adapter.fetch_paths == Counter({"search_http": 1, "search_browser": 1})
+    assert browser_urls == ["https://www.amazon.co.jp/s?k=eSIM&page=2"]
+    assert cookies[0] == "i18n-prefs=JPY"
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.adapters.amazon_jp import AmazonJPAdapter
+from app.adapters.base import BlockedPageError
+from app.adapters.in_page import COMPACT_PAGE_SCRIPT
+from app.extractors.amazon_jp import AmazonJPParser
+from app.models import ProductStub
+
+
+class FakePage:
+    def __init__(self, payload: dict) -> None:
+        self.payload = payload
+        self.args: list | None = None
+
+    async def evaluate(self, script: str, args: list) -> dict:
+        assert script == COMPACT_PAGE_SCRIPT
+        self.args = args
+        return self.payload
+
+
+def _adapter() -> AmazonJPAdapter:
+    adapter = object.__new__(AmazonJPAdapter)
+    adapter.in_page_extraction = True
+    return adapter
+
+
+def test_in_page_payload_parses_like_the_full_page():
+    page = FakePage(
+        {
+            "head": ["<title>Amazon.co.jp: 韓国 eSIM</title>"],
+            "body": [
+                '<span id="productTitle">韓国 eSIM 7日間 毎日2GB</span>',
+                '<div id="corePrice_feature_div"><span class="a-offscreen">￥1,480</span></div>',
+                '<span id="acrCustomerReviewText">120個の評価</span>',
+            ],
+            "text": "韓国 eSIM 7日間 毎日2GB\n￥1,480\n120個の評価\n過去1か月で300点以上購入されました & <script>",
+        }
+    )
+    stub = ProductStub(site="amazon_jp", product_url="https://www.amazon.co.jp/dp/B000000080", asin="B000000080")
+
+    html = asyncio.run(_adapter()._read_detail_html(page))
+    detail = AmazonJPParser().parse_detail(html, stub)
+
+    assert "#corePrice_feature_div" in page.args[0]
+    assert "input#captchacharacters" in page.args[0]
+    assert "&lt;script&gt;" in html
+    assert detail.title == "韓国 eSIM 7日間 毎日2GB"
+    assert detail.price_jpy == 1480
+    assert detail.review_count == 120
+    assert detail.monthly_sold_count == 300
+
+
+def test_in_page_payload_keeps_block_markers():
+    page = FakePage(
+        {
+            "head": ["<title>Amazon.co.jp</title>"],
+            "body": ['<input id="captchacharacters" name="field-keywords">'],
+            "text": "文字を入力してください",
+        }
+    )
+    adapter = _adapter()
+    html = asyncio.run(adapter._read_detail_html(page))
+
+    with pytest.raises(BlockedPageError):
+        adapter._raise_if_blocked("https://www.amazon.co.jp/dp/B000000080", html)
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from app.adapters.base import MarketplaceAdapter
+from app.models import ProductDetail, ProductStub
+from app.pipeline.crawler import CrawlPipeline
+from app.pipeline.incremental import PreviousResults, search_signature
+
+NOW = datetime(2026, 5, 1, tzinfo=UTC)
+
+
+def make_stub(i: int, price: int) -> ProductStub:
+    return ProductStub(
+        site="amazon_jp",
+        country="kr",
+        product_url=f"https://www.amazon.co.jp/dp/B00000004{i}",
+        asin=f"B00000004{i}",
+        site_product_id=f"B00000004{i}",
+        search_position=i + 1,
+        search_price_jpy=price,
+        search_review_count=10,
+    )
+
+
+def make_previous(stub: ProductStub, fetched_at: datetime | None) -> ProductDetail:
+    return ProductDetail(
+        site="amazon_jp",
+        country="kr",
+        title=f"previous {stub.asin}",
+        price_jpy=stub.search_price_jpy,
+        product_url=stub.product_url,
+        asin=stub.asin,
+        site_product_id=stub.site_product_id,
+        search_position=99,
+        fetched_at=fetched_at,
+        search_signature=search_signature(stub),
+    )
+
+
+def test_previous_results_reuse_requires_same_signature_and_fresh_record():
+    fresh = make_stub(0, 1000)
+    stale = make_stub(1, 1000)
+    legacy = make_stub(2, 1000)
+    previous = PreviousResults(
+        [
+            make_previous(fresh, NOW - timedelta(hours=5)),
+            make_previous(stale, NOW - timedelta(hours=100)),
+            make_previous(legacy, None),
+        ],
+        max_age=timedelta(hours=72),
+        now=NOW,
+    )
+
+    carried = previous.reuse(fresh)
+    assert carried is not None
+    assert carried.title == "previous B000000040"
+    assert carried.search_position == 1
+    assert "carried_forward" in carried.evidence
+    assert previous.reuse(make_stub(0, 1200)) is None
+    assert previous.reuse(stale) is None
+    assert previous.reuse(legacy) is None
+    assert previous.reuse(make_stub(3, 1000)) is None
+    assert previous.reused == 1
+
+
+class SearchOnlyAdapter(MarketplaceAdapter):
+    name = "amazon_jp"
+
+    def __init__(self, stubs: list[ProductStub]) -> None:
+        self.stubs = stubs
+        self.fetched: list[str] = []
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        return self.stubs[:limit]
+
+    async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        self.fetched.append(stub.asin or "")
+        return ProductDetail(title="fresh", price_jpy=1500, product_url=stub.product_url, asin=stub.asin)
+
+    async def close(self) -> None:
+        return None
+
+
+def test_pipeline_fetches_only_changed_search_cards(tmp_path: Path):
+    unchanged = make_stub(0, 1000)
+    changed = make_stub(1, 1500)
+    latest = tmp_path / "sites" / "amazon_jp" / "kr" / "latest.jsonl"
+    latest.parent.mkdir(parents=True)
+    rows = [
+        make_previous(unchanged, datetime.now(UTC) - timedelta(hours=1)),
+        make_previous(make_stub(1, 1000), datetime.now(UTC) - timedelta(hours=1)),
+    ]
+    latest.write_text("".join(json.dumps(row.model_dump(mode="json")) + "\n" for row in rows), encoding="utf-8")
+
+    adapter = SearchOnlyAdapter([unchanged, changed])
+    pipeline = CrawlPipeline(
+        adapter=adapter,
+        out_dir=tmp_path / "out",
+        concurrency=1,
+        min_delay=0,
+        max_delay=0,
+        previous=PreviousResults.from_dashboard(tmp_path, "amazon_jp", "kr", max_age=timedelta(hours=72)),
+    )
+
+    result = asyncio.run(pipeline.run(query="eSIM 韓国", limit=2, country="kr"))
+
+    assert adapter.fetched == ["B000000041"]
+    titles = {item.asin: item.title for item in result.items}
+    assert titles == {"B000000040": "previous B000000040", "B000000041": "fresh"}
+    fresh = next(item for item in result.items if item.asin == "B000000041")
+    assert fresh.fetched_at is not None
+    assert fresh.search_signature == search_signature(changed)
@@ -0,0 +1,125 @@
+import asyncio
+import json
+from pathlib import Path
+
+from app.adapters.base import MarketplaceAdapter
+from app.models import CarrierSupportKR, CrawlError, ProductDetail, ProductStub
+from app.pipeline.crawler import CrawlPipeline
+from app.pipeline.distributed import run_coordinator, run_worker
+from app.pipeline.jobqueue import JobQueue
+from app.pipeline.journal import CrawlJournal
+from app.pipeline.matrix import CrawlTarget
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _stub(i: int) -> ProductStub:
+    return ProductStub(site="fake", product_url=f"https://www.amazon.co.jp/dp/B00000000{i}", asin=f"B00000000{i}")
+
+
+def _queue(tmp_path: Path, clock: FakeClock, max_attempts: int = 3) -> JobQueue:
+    run_info = {"site": "fake", "country": "kr", "query": "eSIM", "limit": 3}
+    queue = JobQueue.create(tmp_path / "jobs.sqlite", run_info, lease_seconds=60, max_attempts=max_attempts)
+    queue.clock = clock
+    return queue
+
+
+def test_expired_lease_is_reissued_and_late_result_is_dropped(tmp_path: Path):
+    clock = FakeClock()
+    queue = _queue(tmp_path, clock)
+    queue.enqueue(_stub(2), position=2)
+    queue.enqueue(_stub(1), position=1)
+    queue.mark_search_complete()
+
+    first = queue.lease("dead-worker", limit=2)
+    assert [lease.stub.asin for lease in first] == ["B000000001", "B000000002"]
+    assert queue.lease("other-worker") == []
+
+    clock.now += 61
+    reissued = queue.lease("other-worker", limit=2)
+    assert [lease.attempts for lease in reissued] == [2, 2]
+
+    failure = CrawlError(product_url=str(first[0].stub.product_url), error_type="RuntimeError", error_message="late")
+    assert queue.complete(first[0].job_id, "dead-worker", "failed", failure) is False
+    assert queue.complete(reissued[0].job_id, "other-worker", "failed", failure) is True
+    assert [result.product_url for result in queue.results_after(0)] == [str(first[0].stub.product_url)]
+    assert not queue.is_drained()
+    queue.close()
+
+
+def test_job_is_closed_as_failed_after_last_lease_expires(tmp_path: Path):
+    clock = FakeClock()
+    queue = _queue(tmp_path, clock, max_attempts=2)
+    queue.enqueue(_stub(1), position=1)
+    queue.mark_search_complete()
+
+    for _ in range(2):
+        assert len(queue.lease("crashy")) == 1
+        clock.now += 61
+    assert queue.lease("crashy") == []
+    assert queue.expire_exhausted() == 1
+
+    [result] = queue.results_after(0)
+    assert result.outcome == "failed"
+    assert result.payload["error_type"] == "LeaseExpired"
+    assert queue.is_drained()
+    queue.close()
+
+
+class FakeAdapter(MarketplaceAdapter):
+    name = "fake"
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        return [_stub(i) for i in range(1, limit + 1)]
+
+    async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        return ProductDetail(
+            title="sample esim",
+            price_jpy=1200,
+            validity="7일",
+            network_type="roaming",
+            carrier_support_kr=CarrierSupportKR(skt=True, kt=None, lgu=None),
+            data_amount="1GB",
+            product_url=stub.product_url,
+            asin=stub.asin,
+            evidence={"title": ["sample esim"]},
+        )
+
+    async def close(self) -> None:
+        return None
+
+
+def test_coordinator_assembles_results_posted_by_workers(tmp_path: Path):
+    out = tmp_path / "out"
+    journal = CrawlJournal.start(out, site="fake", country="kr", query="eSIM", limit=3)
+    coordinator_queue = JobQueue.create(tmp_path / "jobs.sqlite", journal.run_info)
+    target = CrawlTarget(site="fake", country="kr", query="eSIM", out_dir=out)
+
+    async def main() -> None:
+        coordinator = asyncio.create_task(
+            run_coordinator(FakeAdapter(), coordinator_queue, target, limit=3, journal=journal, poll_interval=0.01)
+        )
+        workers = []
+        for name in ("host-a", "host-b"):
+            queue = JobQueue.open(tmp_path / "jobs.sqlite")
+            pipeline = CrawlPipeline(FakeAdapter(), out_dir=tmp_path / name, concurrency=2, min_delay=0, max_delay=0)
+            workers.append(run_worker(pipeline, queue, worker=name, poll_interval=0.01))
+        sinks = await asyncio.gather(*workers)
+        await coordinator
+        assert sum(sink.posted for sink in sinks) == 3
+
+    asyncio.run(main())
+    coordinator_queue.close()
+
+    rows = [json.loads(line) for line in (out / "results.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert sorted(row["asin"] for row in rows) == ["B000000001", "B000000002", "B000000003"]
+    assert all(row["country"] == "kr" for row in rows)
+    journal_events = [json.loads(line)["event"] for line in (out / "journal.jsonl").read_text().splitlines()]
+    assert journal_events.count("item") == 3
+    assert json.loads((out / "run_stats.json").read_text())["job_queue"]["jobs"] == 3
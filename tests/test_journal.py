@@ -0,0 +1,87 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from app.adapters.base import MarketplaceAdapter
+from app.models import ProductDetail, ProductStub
+from app.output.sinks import FileResultSink
+from app.pipeline.crawler import CrawlPipeline
+from app.pipeline.journal import CrawlJournal, JournalMismatchError
+
+
+class CountingAdapter(MarketplaceAdapter):
+    name = "counting"
+
+    def __init__(self, fail_on: str | None = None) -> None:
+        self.search_calls = 0
+        self.fetched: list[str] = []
+        self.fail_on = fail_on
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        self.search_calls += 1
+        return [
+            ProductStub(product_url=f"https://www.amazon.co.jp/dp/B00000000{i}", asin=f"B00000000{i}")
+            for i in range(limit)
+        ]
+
+    async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        if stub.asin == self.fail_on:
+            raise KeyboardInterrupt
+        self.fetched.append(stub.asin or "")
+        return ProductDetail(title="sample", price_jpy=1000, product_url=stub.product_url, asin=stub.asin)
+
+    async def close(self) -> None:
+        return None
+
+
+def _run(adapter: MarketplaceAdapter, out: Path, journal: CrawlJournal) -> FileResultSink:
+    keep_urls = set(journal.finished) if journal.finished else None
+    pipeline = CrawlPipeline(adapter=adapter, out_dir=out, concurrency=1, min_delay=0, max_delay=0, max_retries=1)
+    with FileResultSink(out, keep_urls=keep_urls) as sink:
+        try:
+            asyncio.run(pipeline.run_to_sink(sink, query="eSIM 韓国", limit=4, country="kr", journal=journal))
+        finally:
+            journal.close()
+    return sink
+
+
+def test_resume_skips_finished_items_and_reuses_search(tmp_path: Path):
+    first = CountingAdapter(fail_on="B000000002")
+    journal = CrawlJournal.start(tmp_path, site="counting", country="kr", query="eSIM 韓国", limit=4)
+    with pytest.raises(KeyboardInterrupt):
+        _run(first, tmp_path, journal)
+    assert first.fetched == ["B000000000", "B000000001"]
+
+    second = CountingAdapter()
+    journal = CrawlJournal.resume(tmp_path, site="counting", country="kr", query="eSIM 韓国", limit=4)
+    sink = _run(second, tmp_path, journal)
+
+    assert second.search_calls == 0
+    assert second.fetched == ["B000000002", "B000000003"]
+    assert sink.item_count == 4
+    rows = [json.loads(line) for line in (tmp_path / "results.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert sorted(row["asin"] for row in rows) == ["B000000000", "B000000001", "B000000002", "B000000003"]
+    assert all(row["country"] == "kr" for row in rows)
+    assert len((tmp_path / "results.csv").read_text(encoding="utf-8-sig").splitlines()) == 5
+
+
+def test_resume_drops_rows_missing_from_journal(tmp_path: Path):
+    journal = CrawlJournal.start(tmp_path, site="counting", country="kr", query="eSIM 韓国", limit=4)
+    _run(CountingAdapter(), tmp_path, journal)
+    with (tmp_path / "results.jsonl").open("a", encoding="utf-8") as f:
+        f.write('{"title": "torn')
+
+    journal = CrawlJournal.resume(tmp_path, site="counting", country="kr", query="eSIM 韓国", limit=4)
+    sink = _run(CountingAdapter(), tmp_path, journal)
+
+    assert sink.item_count == 4
+    assert len((tmp_path / "results.jsonl").read_text(encoding="utf-8").splitlines()) == 4
+
+
+def test_resume_rejects_different_run(tmp_path: Path):
+    CrawlJournal.start(tmp_path, site="counting", country="kr", query="eSIM 韓国", limit=4).close()
+
+    with pytest.raises(JournalMismatchError):
+        CrawlJournal.resume(tmp_path, site="counting", country="vn", query="eSIM 韓国", limit=4)
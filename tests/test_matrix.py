@@ -0,0 +1,162 @@
+import asyncio
+import json
+from pathlib import Path
+
+from app.adapters.base import MarketplaceAdapter
+from app.models import ProductDetail, ProductStub
+from app.pipeline import matrix
+from app.pipeline.crawler import CrawlPipeline
+from app.pipeline.matrix import CrawlTarget, run_matrix
+
+
+class TrackingAdapter(MarketplaceAdapter):
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        return [
+            ProductStub(site=self.name, product_url=f"https://www.amazon.co.jp/dp/B00000000{i}", asin=f"B00000000{i}")
+            for i in range(limit)
+        ]
+
+    async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return ProductDetail(site=self.name, title="sample", price_jpy=1000, product_url=stub.product_url, asin=stub.asin)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_run_matrix_shares_one_adapter_per_site_and_caps_concurrency(tmp_path: Path, monkeypatch):
+    adapters: dict[str, TrackingAdapter] = {}
+
+    async def fake_create_adapter(site: str, screenshot_dir: Path, **kwargs) -> MarketplaceAdapter:
+        adapters[site] = TrackingAdapter(site)
+        return adapters[site]
+
+    monkeypatch.setattr(matrix, "create_adapter", fake_create_adapter)
+    targets = [
+        CrawlTarget(site=site, country=country, query=f"eSIM {country}", out_dir=tmp_path / site / country)
+        for site in ("site_a", "site_b")
+        for country in ("kr", "vn", "th")
+    ]
+
+    def make_pipeline(adapter, target, limiters):
+        return CrawlPipeline(
+            adapter=adapter,
+            out_dir=target.out_dir,
+            concurrency=4,
+            min_delay=0,
+            max_delay=0,
+            limiters=limiters,
+        )
+
+    outcomes = asyncio.run(
+        run_matrix(
+            targets,
+            limit=4,
+            out_root=tmp_path,
+            site_concurrency=2,
+            global_concurrency=3,
+            pipeline_factory=make_pipeline,
+        )
+    )
+
+    assert all(error is None for error in outcomes.values())
+    assert set(adapters) == {"site_a", "site_b"}
+    assert all(adapter.closed for adapter in adapters.values())
+    assert all(adapter.max_in_flight <= 2 for adapter in adapters.values())
+    for target in targets:
+        lines = (target.out_dir / "results.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 4
+        assert f'"country": "{target.country}"' in lines[0]
+
+
+class PageAdapter(MarketplaceAdapter):
+    name = "pages"
+
+    def __init__(self, screenshot_dir: Path) -> None:
+        self.screenshot_dir = screenshot_dir
+        self.loads: list[str] = []
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        # Each country query ranks the same multi-country listings differently.
+        order = range(limit) if query.endswith("hk") else reversed(range(limit))
+        return [
+            ProductStub(
+                site=self.name,
+                product_url=f"https://www.qoo10.jp/item/ESIM/11332416{i}",
+                site_product_id=f"11332416{i}",
+                search_position=position,
+            )
+            for position, i in enumerate(order, start=1)
+        ]
+
+    async def fetch_detail_html(self, stub: ProductStub) -> str:
+        self.loads.append(stub.site_product_id or "")
+        await asyncio.sleep(0.01)
+        return f"<html><body><h1>Asia eSIM {stub.site_product_id}</h1></body></html>"
+
+    def parse_detail(self, html: str, stub: ProductStub) -> ProductDetail:
+        return ProductDetail(
+            site=self.name,
+            country=stub.country,
+            title=html.split("<h1>")[1].split("</h1>")[0],
+            price_jpy=1000,
+            product_url=stub.product_url,
+            site_product_id=stub.site_product_id,
+            search_position=stub.search_position,
+        )
+
+    async def close(self) -> None:
+        return None
+
+
+def test_run_matrix_loads_each_product_once_across_countries(tmp_path: Path, monkeypatch):
+    adapter = PageAdapter(tmp_path)
+
+    async def fake_create_adapter(site: str, screenshot_dir: Path, **kwargs) -> MarketplaceAdapter:
+        return adapter
+
+    monkeypatch.setattr(matrix, "create_adapter", fake_create_adapter)
+    targets = [
+        CrawlTarget(site="pages", country=country, query=f"eSIM {country}", out_dir=tmp_path / country)
+        for country in ("hk", "mo")
+    ]
+
+    def make_pipeline(adapter, target, limiters):
+        return CrawlPipeline(adapter=adapter, out_dir=target.out_dir, concurrency=2, min_delay=0, max_delay=0)
+
+    outcomes = asyncio.run(
+        run_matrix(
+            targets,
+            limit=3,
+            out_root=tmp_path,
+            site_concurrency=2,
+            global_concurrency=4,
+            pipeline_factory=make_pipeline,
+        )
+    )
+
+    assert all(error is None for error in outcomes.values())
+    assert sorted(adapter.loads) == ["113324160", "113324161", "113324162"]
+    assert adapter.detail_pages is not None and adapter.detail_pages.hits == 3
+    matrix_stats = json.loads((tmp_path / "matrix_stats.json").read_text(encoding="utf-8"))
+    assert matrix_stats["sites"]["pages"]["detail_pages"] == {"loaded": 3, "reused": 3}
+    for target in targets:
+        pair_stats = json.loads((target.out_dir / "run_stats.json").read_text(encoding="utf-8"))
+        assert "detail_pages" not in pair_stats
+        assert "rate_limit" not in pair_stats
+    for target in targets:
+        rows = [json.loads(line) for line in (target.out_dir / "results.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert {row["country"] for row in rows} == {target.country}
+        positions = {row["site_product_id"]: row["search_position"] for row in rows}
+        expected = {"113324160": 1, "113324162": 3} if target.country == "hk" else {"113324160": 3, "113324162": 1}
+        assert positions["113324160"] == expected["113324160"]
+        assert positions["113324162"] == expected["113324162"]
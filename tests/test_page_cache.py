@@ -0,0 +1,122 @@
+import asyncio
+import os
+from pathlib import Path
+
+from app.adapters.base import MarketplaceAdapter, track_detail_fetch
+from app.adapters.page_cache import DetailPageCache
+from app.adapters.page_memo import DetailPageMemo
+from app.models import ProductDetail, ProductStub
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_page_cache_roundtrip_normalizes_url_and_expires(tmp_path: Path):
+    clock = FakeClock()
+    cache = DetailPageCache(tmp_path, ttl_seconds=60, max_bytes=10_000_000, clock=clock)
+
+    cache.put("https://www.qoo10.jp/item/ESIM/1133241666?banner_no=1170169", "<html>韓国 eSIM</html>")
+
+    assert cache.get("https://www.qoo10.jp/item/ESIM/1133241666") == "<html>韓国 eSIM</html>"
+    path = cache.path_for("https://www.qoo10.jp/item/ESIM/1133241666")
+    assert path.name.endswith(".html.gz")
+
+    clock.now = path.stat().st_mtime + 61
+    assert cache.get("https://www.qoo10.jp/item/ESIM/1133241666") is None
+    assert not path.exists()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_page_cache_evicts_oldest_pages_over_size_limit(tmp_path: Path):
+    cache = DetailPageCache(tmp_path, ttl_seconds=3600, max_bytes=10_000_000, clock=FakeClock())
+    for i in range(3):
+        cache.put(f"https://www.amazon.co.jp/dp/B00000005{i}", f"<html>{i}</html>" * 50)
+        path = cache.path_for(f"https://www.amazon.co.jp/dp/B00000005{i}")
+        os.utime(path, (1_000_000 + i, 1_000_000 + i))
+    sizes = [cache.path_for(f"https://www.amazon.co.jp/dp/B00000005{i}").stat().st_size for i in range(3)]
+
+    cache.max_bytes = sum(sizes) + sizes[0] // 2
+    cache.put("https://www.amazon.co.jp/dp/B000000059", "<html>new</html>" * 50)
+
+    assert not cache.path_for("https://www.amazon.co.jp/dp/B000000050").exists()
+    assert cache.path_for("https://www.amazon.co.jp/dp/B000000059").exists()
+
+
+def test_concurrent_puts_of_one_url_keep_the_size_and_leave_no_temp_files(tmp_path: Path):
+    cache = DetailPageCache(tmp_path, ttl_seconds=3600, max_bytes=10_000_000)
+    url = "https://www.qoo10.jp/item/ESIM/1133241666"
+
+    async def main() -> None:
+        await asyncio.gather(*(asyncio.to_thread(cache.put, url, f"<html>{i}</html>" * 500) for i in range(16)))
+        await asyncio.gather(*(asyncio.to_thread(cache.get, url) for _ in range(16)))
+
+    asyncio.run(main())
+
+    path = cache.path_for(url)
+    assert cache._size == path.stat().st_size
+    assert list(tmp_path.glob("*/*.tmp")) == []
+    assert (cache.hits, cache.misses) == (16, 0)
+
+
+class CachedAdapter(MarketplaceAdapter):
+    name = "cached"
+
+    def __init__(self, screenshot_dir: Path) -> None:
+        self.screenshot_dir = screenshot_dir
+        self.loads = 0
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        return []
+
+    async def fetch_detail_html(self, stub: ProductStub) -> str:
+        self.loads += 1
+        return "<html><h1>sample</h1></html>"
+
+    def parse_detail(self, html: str, stub: ProductStub) -> ProductDetail:
+        return ProductDetail(title=html[10:16], price_jpy=1000, product_url=stub.product_url)
+
+    async def close(self) -> None:
+        return None
+
+
+def test_adapter_parses_cached_page_without_loading_it(tmp_path: Path):
+    adapter = CachedAdapter(tmp_path)
+    adapter.page_cache = DetailPageCache(tmp_path / "cache", ttl_seconds=3600, max_bytes=10_000_000)
+    stub = ProductStub(product_url="https://www.amazon.co.jp/dp/B000000060")
+
+    async def main() -> list[ProductDetail]:
+        return [await adapter.fetch_detail(stub), await adapter.fetch_detail(stub)]
+
+    details = asyncio.run(main())
+
+    assert adapter.loads == 1
+    assert [detail.title for detail in details] == ["sample", "sample"]
+
+
+def test_cache_and_memo_hits_are_flagged_for_latency_tracking(tmp_path: Path):
+    adapter = CachedAdapter(tmp_path)
+    adapter.page_cache = DetailPageCache(tmp_path / "cache", ttl_seconds=3600, max_bytes=10_000_000)
+    adapter.detail_pages = DetailPageMemo()
+    stubs = [
+        ProductStub(product_url="https://www.amazon.co.jp/dp/B000000061", asin="B000000061"),
+        ProductStub(product_url="https://www.amazon.co.jp/dp/B000000061", asin="B000000061"),
+    ]
+
+    async def fetch(stub: ProductStub) -> bool:
+        with track_detail_fetch() as record:
+            await adapter.fetch_detail(stub)
+        return record.from_cache
+
+    async def main() -> list[bool]:
+        flags = [await fetch(stubs[0]), await fetch(stubs[1])]
+        adapter.detail_pages = DetailPageMemo()
+        flags.append(await fetch(stubs[0]))
+        return flags
+
+    assert asyncio.run(main()) == [False, True, True]
+    assert adapter.loads == 1
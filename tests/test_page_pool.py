@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from app.adapters.page_pool import PagePool
+
+
+class FakePage:
+    def __init__(self, number: int) -> None:
+        self.number = number
+        self.urls: list[str] = []
+        self.closed = False
+        self.listeners: list[tuple[str, object]] = []
+
+    def on(self, event: str, handler) -> None:
+        self.listeners.append((event, handler))
+
+    def remove_listener(self, event: str, handler) -> None:
+        self.listeners.remove((event, handler))
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def goto(self, url: str, **kwargs) -> None:
+        self.urls.append(url)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _pool(size: int = 1, max_uses: int = 50) -> tuple[PagePool, list[FakePage]]:
+    pages: list[FakePage] = []
+
+    async def new_page() -> FakePage:
+        pages.append(FakePage(len(pages)))
+        return pages[-1]
+
+    return PagePool(new_page, size=size, max_uses=max_uses), pages
+
+
+def test_page_pool_reuses_clean_pages_and_replaces_failed_ones():
+    pool, pages = _pool()
+
+    async def main() -> None:
+        async with pool.page() as page:
+            await page.goto("https://www.qoo10.jp/item/1")
+        async with pool.page() as page:
+            assert page is pages[0]
+        with pytest.raises(RuntimeError):
+            async with pool.page() as page:
+                raise RuntimeError("navigation failed")
+        async with pool.page() as page:
+            assert page is pages[1]
+        await pool.close()
+
+    asyncio.run(main())
+
+    assert pages[0].urls == ["https://www.qoo10.jp/item/1", "about:blank", "about:blank"]
+    assert pages[0].closed
+    assert (pool.created, pool.reused, pool.discarded) == (2, 2, 1)
+
+
+def test_page_pool_retires_pages_after_max_uses_and_caps_idle_pages():
+    pool, pages = _pool(size=1, max_uses=2)
+
+    async def main() -> None:
+        for _ in range(3):
+            async with pool.page():
+                pass
+        pool.grow_to(2)
+        async with pool.page(), pool.page(), pool.page():
+            pass
+
+    asyncio.run(main())
+
+    # Page 0 retires after two uses; of the three concurrent pages the last one back is dropped.
+    assert [page.closed for page in pages] == [True, True, False, False]
+    assert len(pool._idle) == 2
+
+
+def test_page_pool_removes_listeners_added_through_it():
+    pool, pages = _pool()
+
+    def on_response(response) -> None:
+        pass
+
+    async def main() -> None:
+        async with pool.page() as page:
+            pool.on(page, "response", on_response)
+            assert page.listeners == [("response", on_response)]
+        async with pool.page() as page:
+            assert page is pages[0]
+            assert page.listeners == []
+
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from app.adapters.base import MarketplaceAdapter
+from app.extractors.amazon_jp import AmazonJPParser
+from app.models import ProductStub
+from app.utils.loop_monitor import EventLoopLagMonitor
+
+DETAIL_HTML = """
+<html>
+  <body>
+    <span id="productTitle">韓国 eSIM 7日間 毎日2GB SKテレコム</span>
+    <span class="a-price"><span class="a-offscreen">￥1,480</span></span>
+    <a id="sellerProfileTriggerId">Example Store</a>
+    <span id="acrCustomerReviewText">120個の評価</span>
+  </body>
+</html>
+"""
+
+
+class OfflineAmazonAdapter(AmazonJPParser, MarketplaceAdapter):
+    parser = AmazonJPParser
+
+    def __init__(self, screenshot_dir: Path) -> None:
+        self.screenshot_dir = screenshot_dir
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        return []
+
+    async def fetch_detail_html(self, stub: ProductStub) -> str:
+        return DETAIL_HTML
+
+    async def close(self) -> None:
+        return None
+
+
+def test_detail_parsing_in_process_pool_matches_inline(tmp_path: Path):
+    adapter = OfflineAmazonAdapter(tmp_path)
+    stub = ProductStub(
+        site="amazon_jp",
+        country="kr",
+        product_url="https://www.amazon.co.jp/dp/B000000080",
+        asin="B000000080",
+        search_position=4,
+    )
+    inline = asyncio.run(adapter.fetch_detail(stub))
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        adapter.parse_executor = executor
+        pooled = asyncio.run(adapter.fetch_detail(stub))
+
+    assert pooled == inline
+    assert pooled.price_jpy == 1480
+    assert pooled.search_position == 4
+    assert pooled.review_count == 120
+
+
+def test_event_loop_lag_monitor_sees_blocking_work():
+    monitor = EventLoopLagMonitor(interval=0.01)
+
+    async def main() -> None:
+        monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.2)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+    asyncio.run(main())
+
+    report = monitor.report()
+    assert report["samples"] >= 2
+    assert report["max_ms"] >= 150
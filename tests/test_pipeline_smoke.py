@@ -1,10 +1,16 @@
 import asyncio
+import json
+from collections.abc import AsyncIterator
 from pathlib import Path
 
-from app.adapters.base import MarketplaceAdapter
+from app.adapters.base import BlockedPageError, MarketplaceAdapter
+from app.adapters.page_memo import DetailPageMemo
 from app.models import CarrierSupportKR, ProductDetail, ProductStub
+from app.output.sinks import FileResultSink, MemoryResultSink
 from app.output.writers import write_csv, write_failed_jsonl, write_invalid_csv, write_invalid_jsonl, write_jsonl
+from app.pipeline.circuit import CircuitBreaker
 from app.pipeline.crawler import CrawlPipeline
+from app.pipeline.journal import CrawlJournal
 
 
 class FakeAdapter(MarketplaceAdapter):
@@ -81,6 +87,24 @@ def test_pipeline_smoke(tmp_path: Path):
     assert "country" in (tmp_path / "results.csv").read_text(encoding="utf-8-sig")
 
 
+def test_pipeline_streams_into_file_sink(tmp_path: Path):
+    adapter = FakeAdapter()
+    pipeline = CrawlPipeline(adapter=adapter, out_dir=tmp_path, concurrency=2, min_delay=0, max_delay=0)
+
+    with FileResultSink(tmp_path) as sink:
+        asyncio.run(pipeline.run_to_sink(sink, query="eSIM 韓国", limit=5, country="kr"))
+
+    assert (sink.item_count, sink.invalid_count, sink.failure_count) == (3, 1, 1)
+    result_lines = (tmp_path / "results.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(result_lines) == 3
+    assert all('"country": "kr"' in line for line in result_lines)
+    csv_lines = (tmp_path / "results.csv").read_text(encoding="utf-8-sig").splitlines()
+    assert csv_lines[0].startswith("site,country,title")
+    assert len(csv_lines) == 4
+    assert len((tmp_path / "failed.jsonl").read_text(encoding="utf-8").splitlines()) == 1
+    assert len((tmp_path / "invalid.csv").read_text(encoding="utf-8-sig").splitlines()) == 2
+
+
 class HangingAdapter(MarketplaceAdapter):
     name = "hanging"
 
@@ -121,3 +145,268 @@ def test_pipeline_times_out_stuck_detail(tmp_path: Path):
     assert len(result.failures) == 1
     assert result.failures[0].country == "tw"
     assert "timed out" in result.failures[0].error_message
+
+
+class StreamingAdapter(MarketplaceAdapter):
+    name = "streaming"
+
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        return [stub async for stub in self.iter_search(query=query, limit=limit)]
+
+    async def iter_search(self, query: str, limit: int):
+        for i in range(limit):
+            self.events.append(f"search:{i}")
+            yield ProductStub(product_url=f"https://www.amazon.co.jp/dp/B00000001{i}", asin=f"B00000001{i}")
+            await asyncio.sleep(0.01)
+        self.events.append("search:done")
+
+    async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        self.events.append(f"detail:{stub.asin}")
+        return ProductDetail(title="sample", price_jpy=1000, product_url=stub.product_url, asin=stub.asin)
+
+    async def close(self) -> None:
+        return None
+
+
+def test_pipeline_fetches_details_while_search_is_running(tmp_path: Path):
+    adapter = StreamingAdapter()
+    pipeline = CrawlPipeline(adapter=adapter, out_dir=tmp_path, concurrency=2, min_delay=0, max_delay=0)
+
+    result = asyncio.run(pipeline.run(query="eSIM 韓国", limit=3, country="kr"))
+
+    assert len(result.items) == 3
+    assert adapter.events.index("detail:B000000010") < adapter.events.index("search:done")
+
+
+class SlowAdapter(MarketplaceAdapter):
+    name = "slow"
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        return [
+            ProductStub(product_url=f"https://www.amazon.co.jp/dp/B00000002{i}", asin=f"B00000002{i}", search_position=i)
+            for i in range(1, limit + 1)
+        ]
+
+    async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        await asyncio.sleep(0.2)
+        return ProductDetail(
+            title="sample",
+            price_jpy=1000,
+            product_url=stub.product_url,
+            asin=stub.asin,
+            search_position=stub.search_position,
+        )
+
+    async def close(self) -> None:
+        return None
+
+
+def test_pipeline_skips_fetches_past_time_budget(tmp_path: Path):
+    pipeline = CrawlPipeline(
+        adapter=SlowAdapter(),
+        out_dir=tmp_path,
+        concurrency=1,
+        min_delay=0,
+        max_delay=0,
+        time_budget=0.5,
+    )
+
+    result = asyncio.run(pipeline.run(query="eSIM 韓国", limit=4, country="kr"))
+
+    assert [item.search_position for item in result.items] == [1, 2]
+    assert [stub.search_position for stub in result.skipped] == [3, 4]
+    assert pipeline.skipped_count == 2
+
+
+class SlowSearchAdapter(SlowAdapter):
+    async def iter_search(self, query: str, limit: int) -> AsyncIterator[ProductStub]:
+        for stub in await self.search(query, limit):
+            await asyncio.sleep(0.2)
+            yield stub
+
+    async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        return ProductDetail(
+            title="sample",
+            price_jpy=1000,
+            product_url=stub.product_url,
+            asin=stub.asin,
+            search_position=stub.search_position,
+        )
+
+
+def test_pipeline_records_stub_in_hand_when_budget_stops_search(tmp_path: Path):
+    pipeline = CrawlPipeline(
+        adapter=SlowSearchAdapter(),
+        out_dir=tmp_path,
+        concurrency=1,
+        min_delay=0,
+        max_delay=0,
+        time_budget=0.5,
+    )
+
+    result = asyncio.run(pipeline.run(query="eSIM 韓国", limit=6, country="kr"))
+    stats = json.loads((tmp_path / "run_stats.json").read_text(encoding="utf-8"))
+
+    assert [item.search_position for item in result.items] == [1, 2]
+    assert [stub.search_position for stub in result.skipped] == [3]
+    assert stats["time_budget"]["search_cut_short"] is True
+
+
+class SlowFailingAdapter(SlowAdapter):
+    async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        await asyncio.sleep(0.3)
+        raise RuntimeError("connection reset")
+
+
+def test_failure_past_time_budget_is_skipped_for_a_later_run(tmp_path: Path):
+    journal = CrawlJournal.start(tmp_path, site="slow", country="kr", query="eSIM 韓国", limit=1)
+    pipeline = CrawlPipeline(
+        adapter=SlowFailingAdapter(),
+        out_dir=tmp_path,
+        concurrency=1,
+        min_delay=0,
+        max_delay=0,
+        time_budget=0.2,
+    )
+
+    sink = MemoryResultSink()
+    asyncio.run(pipeline.run_to_sink(sink, query="eSIM 韓国", limit=1, country="kr", journal=journal))
+    journal.close()
+    result = sink.result()
+    resumed = CrawlJournal.resume(tmp_path, site="slow", country="kr", query="eSIM 韓国", limit=1)
+    resumed.close()
+
+    assert result.failures == []
+    assert [stub.search_position for stub in result.skipped] == [1]
+    assert not resumed.is_finished(str(result.skipped[0].product_url))
+
+
+class BlockedAdapter(MarketplaceAdapter):
+    name = "blocked"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        return [ProductStub(product_url=f"https://www.amazon.co.jp/dp/B00000003{i}", asin=f"B00000003{i}") for i in range(limit)]
+
+    async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        self.calls += 1
+        raise BlockedPageError(str(stub.product_url), "HTTP 503", status_code=503)
+
+    async def close(self) -> None:
+        return None
+
+
+def test_pipeline_retries_blocked_pages_a_bounded_number_of_times(tmp_path: Path, monkeypatch):
+    adapter = BlockedAdapter()
+    breaker = CircuitBreaker(threshold=20, cooldown=60.0)
+    journal = CrawlJournal.start(tmp_path, site="blocked", country="kr", query="eSIM 韓国", limit=3)
+    pipeline = CrawlPipeline(
+        adapter=adapter,
+        out_dir=tmp_path,
+        concurrency=1,
+        min_delay=0,
+        max_delay=0,
+        max_retries=3,
+        circuit_breaker=breaker,
+    )
+    monkeypatch.setattr(pipeline, "_retry_delay", lambda attempt: 0.01)
+
+    sink = MemoryResultSink()
+    asyncio.run(pipeline.run_to_sink(sink, query="eSIM 韓国", limit=3, country="kr", journal=journal))
+    journal.close()
+    result = sink.result()
+    resumed = CrawlJournal.resume(tmp_path, site="blocked", country="kr", query="eSIM 韓国", limit=3)
+    resumed.close()
+
+    assert adapter.calls == 9
+    assert [failure.error_type for failure in result.failures] == ["BlockedPageError"] * 3
+    assert {failure.attempts for failure in result.failures} == {3}
+    assert result.failures[0].status_code == 503
+    assert not breaker.is_open("https://www.amazon.co.jp/dp/B000000030")
+    assert len(resumed.blocked) == 3
+    assert not resumed.finished
+
+
+class FlakyAdapter(MarketplaceAdapter):
+    name = "flaky"
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        return [
+            ProductStub(product_url=f"https://www.amazon.co.jp/dp/B00000007{i}", asin=f"B00000007{i}", search_position=i + 1)
+            for i in range(limit)
+        ]
+
+    async def fetch_detail(self, stub: ProductStub) -> ProductDetail:
+        self.calls.append(stub.asin or "")
+        if stub.asin == "B000000070" and self.calls.count("B000000070") == 1:
+            raise RuntimeError("net::ERR_CONNECTION_RESET")
+        if stub.asin == "B000000071":
+            raise RuntimeError("detail parsing failed: always broken")
+        return ProductDetail(title="sample", price_jpy=1000, product_url=stub.product_url, asin=stub.asin)
+
+    async def close(self) -> None:
+        return None
+
+
+def test_pipeline_requeues_failed_attempts_behind_fresh_work(tmp_path: Path, monkeypatch):
+    adapter = FlakyAdapter()
+    pipeline = CrawlPipeline(adapter=adapter, out_dir=tmp_path, concurrency=1, min_delay=0, max_delay=0, max_retries=3)
+    monkeypatch.setattr(pipeline, "_retry_delay", lambda attempt: 0.01)
+
+    result = asyncio.run(pipeline.run(query="eSIM 韓国", limit=3, country="kr"))
+
+    # The first stub's retry waits behind the fresh third stub instead of holding the only slot.
+    assert adapter.calls.index("B000000072") < adapter.calls.index("B000000070", 1)
+    assert sorted(item.asin for item in result.items) == ["B000000070", "B000000072"]
+    assert len(result.failures) == 1
+    assert result.failures[0].asin == "B000000071"
+    assert result.failures[0].attempts == 3
+    assert adapter.calls.count("B000000071") == 3
+    assert pipeline.retry_count == 3
+
+
+class SharedBlockedPageAdapter(MarketplaceAdapter):
+    name = "shared"
+
+    def __init__(self, screenshot_dir: Path) -> None:
+        self.screenshot_dir = screenshot_dir
+        self.detail_pages = DetailPageMemo()
+        self.loads = 0
+
+    async def search(self, query: str, limit: int) -> list[ProductStub]:
+        return []
+
+    async def fetch_detail_html(self, stub: ProductStub) -> str:
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        raise BlockedPageError(str(stub.product_url), "HTTP 503", status_code=503)
+
+    async def close(self) -> None:
+        return None
+
+
+def test_block_shared_through_the_memo_counts_once(tmp_path: Path):
+    adapter = SharedBlockedPageAdapter(tmp_path)
+    breaker = CircuitBreaker(threshold=2, cooldown=60.0)
+    pipeline = CrawlPipeline(adapter=adapter, out_dir=tmp_path, circuit_breaker=breaker)
+    stubs = [
+        ProductStub(product_url="https://www.amazon.co.jp/dp/B000000090", asin="B000000090", country=country)
+        for country in ("kr", "vn", "th")
+    ]
+
+    async def main() -> list:
+        return await asyncio.gather(*(pipeline._fetch_once(stub) for stub in stubs), return_exceptions=True)
+
+    errors = asyncio.run(main())
+
+    assert all(isinstance(error, BlockedPageError) for error in errors)
+    assert adapter.loads == 1
+    assert not breaker.is_open("https://www.amazon.co.jp/dp/B000000090")
@@ -1,6 +1,12 @@
+import asyncio
+from collections import Counter
+
+import httpx
 from bs4 import BeautifulSoup
 
-from app.adapters.qoo10_jp import Qoo10JPAdapter
+from app.adapters.qoo10_jp import NEW_ROWS_SCRIPT, Qoo10JPAdapter
+
+
 def test_extract_site_product_id():
     url = "https://www.qoo10.jp/item/ESIM/1133241666?banner_no=1170169"
     assert Qoo10JPAdapter.extract_site_product_id(url) == "1133241666"
@@ -253,3 +259,133 @@ def test_qoo10_extract_carrier_support_kr_for_kr_country():
     assert support.kt is True
     assert support.lgu is True
     assert evidence
+
+
+def _row(goods_code: int, title: str = "韓国 eSIM 3日間") -> str:
+    return (
+        f'<tr goodscode="{goods_code}"><td><div class="sbj">'
+        f'<a href="https://www.qoo10.jp/item/ESIM/{goods_code}" title="{title}">{title}</a>'
+        f'</div><div class="price">980円</div></td></tr>'
+    )
+
+
+class FakeSearchPage:
+    def __init__(self, rows: list[str]) -> None:
+        self.rows = rows
+        self.starts: list[int] = []
+
+    async def goto(self, url: str, **kwargs):
+        return None
+
+    async def wait_for_selector(self, selector: str, **kwargs) -> None:
+        return None
+
+    async def evaluate(self, script: str, args: list) -> list[str]:
+        assert script == NEW_ROWS_SCRIPT
+        selector, start = args
+        self.starts.append(start)
+        return self.rows[start:]
+
+    async def content(self) -> str:
+        raise AssertionError("the whole page should not be re-read")
+
+    async def close(self) -> None:
+        return None
+
+
+def test_search_reads_only_rows_appended_by_each_more_click():
+    batches = [
+        [_row(1133241001), _row(1133241002), '<tr goodscode="0"><td>広告</td></tr>'],
+        [_row(1133241002), _row(1133241003)],
+        [_row(1133241004, title="ポケットWiFi")],
+    ]
+    page = FakeSearchPage(list(batches[0]))
+    adapter = object.__new__(Qoo10JPAdapter)
+
+    async def new_page():
+        return page
+
+    async def click_more(page_, round_number: int) -> bool:
+        if round_number >= len(batches):
+            return False
+        page.rows.extend(batches[round_number])
+        return True
+
+    adapter.direct_search_pages = False
+    adapter._new_page = new_page
+    adapter._click_more_results = click_more
+
+    async def main() -> list:
+        return [stub async for stub in adapter.iter_search("eSIM", limit=10)]
+
+    stubs = asyncio.run(main())
+
+    assert [stub.site_product_id for stub in stubs] == ["1133241001", "1133241002", "1133241003"]
+    assert [stub.search_position for stub in stubs] == [1, 2, 3]
+    assert page.starts == [0, 3, 5]
+
+
+def _direct_adapter(pages: dict[int, list[int]]) -> tuple[Qoo10JPAdapter, list[int]]:
+    requested: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page_no = int(request.url.params.get("curPage", "1"))
+        requested.append(page_no)
+        rows = "".join(_row(code) for code in pages.get(page_no, pages[1]))
+        return httpx.Response(200, text=f"<html><body><table>{rows}</table></body></html>")
+
+    adapter = object.__new__(Qoo10JPAdapter)
+    adapter.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    adapter.fetch_paths = Counter()
+    return adapter, requested
+
+
+def _search(adapter: Qoo10JPAdapter, limit: int) -> list:
+    async def main() -> list:
+        try:
+            return [stub async for stub in adapter.iter_search("eSIM", limit=limit)]
+        finally:
+            await adapter._close_http_client()
+
+    return asyncio.run(main())
+
+
+def test_search_fetches_numbered_result_pages_in_page_order():
+    adapter, requested = _direct_adapter(
+        {
+            1: [1133241001, 1133241002, 1133241003],
+            2: [1133241003, 1133241004, 1133241005],
+            3: [1133241006, 1133241007, 1133241008],
+        }
+    )
+
+    stubs = _search(adapter, limit=7)
+
+    assert [stub.site_product_id for stub in stubs] == [f"113324100{i}" for i in range(1, 8)]
+    assert [stub.search_position for stub in stubs] == list(range(1, 8))
+    assert sorted(requested) == [1, 2, 3]
+    assert adapter.fetch_paths == Counter({"search_http": 3})
+
+
+def test_search_falls_back_to_more_clicks_when_page_numbers_are_ignored():
+    adapter, requested = _direct_adapter({1: [1133241001, 1133241002]})
+    page = FakeSearchPage([_row(1133241001), _row(1133241002)])
+
+    async def new_page():
+        return page
+
+    async def click_more(page_, round_number: int) -> bool:
+        if round_number > 1:
+            return False
+        page.rows.append(_row(1133241003))
+        return True
+
+    adapter._new_page = new_page
+    adapter._click_more_results = click_more
+
+    stubs = _search(adapter, limit=10)
+
+    assert [stub.site_product_id for stub in stubs] == ["1133241001", "1133241002", "1133241003"]
+    assert [stub.search_position for stub in stubs] == [1, 2, 3]
+    assert requested == [1, 2]
+    assert page.starts == [0, 2]
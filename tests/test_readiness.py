@@ -0,0 +1,53 @@
+import asyncio
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.adapters.readiness import Readiness, wait_for_count_above, wait_until_ready
+
+
+class FakePage:
+    def __init__(self, present: set[str], rows: int = 0) -> None:
+        self.present = present
+        self.rows = rows
+        self.calls: list[tuple[str, object]] = []
+
+    async def wait_for_selector(self, selector: str, state: str, timeout: float) -> None:
+        self.calls.append(("selector", selector))
+        assert timeout >= 1
+        if selector not in self.present:
+            raise PlaywrightTimeoutError(f"waiting for {selector}")
+
+    async def wait_for_load_state(self, state: str, timeout: float) -> None:
+        self.calls.append(("load_state", state))
+
+    async def wait_for_timeout(self, ms: int) -> None:
+        self.calls.append(("sleep", ms))
+
+    async def wait_for_function(self, expression: str, arg: list, timeout: int) -> None:
+        if self.rows <= arg[1]:
+            raise PlaywrightTimeoutError("rows did not grow")
+
+
+def test_ready_page_is_read_without_the_fixed_sleep():
+    page = FakePage({"#productTitle", "#corePrice_feature_div"})
+    readiness = Readiness(selectors=("#productTitle", "#corePrice_feature_div"), network_idle=True, fallback_ms=900)
+
+    assert asyncio.run(wait_until_ready(page, readiness)) is True
+    assert page.calls == [
+        ("selector", "#productTitle"),
+        ("selector", "#corePrice_feature_div"),
+        ("load_state", "networkidle"),
+    ]
+
+
+def test_missing_selector_falls_back_to_the_fixed_sleep():
+    page = FakePage({"#productTitle"})
+    readiness = Readiness(selectors=("#productTitle", "#corePrice_feature_div"), timeout_ms=10, fallback_ms=900)
+
+    assert asyncio.run(wait_until_ready(page, readiness)) is False
+    assert page.calls[-1] == ("sleep", 900)
+
+
+def test_wait_for_count_above_reports_whether_rows_were_appended():
+    assert asyncio.run(wait_for_count_above(FakePage(set(), rows=40), "tr[goodscode]", 20, timeout_ms=10))
+    assert not asyncio.run(wait_for_count_above(FakePage(set(), rows=20), "tr[goodscode]", 20, timeout_ms=10))
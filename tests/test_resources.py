@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.adapters.amazon_jp import AmazonJPAdapter
+from app.adapters.resources import ResourceBlocker, ResourcePolicy
+
+
+class FakeRoute:
+    def __init__(self, resource_type: str, url: str) -> None:
+        self.request = SimpleNamespace(resource_type=resource_type, url=url)
+        self.outcome: str | None = None
+
+    async def abort(self, error_code: str) -> None:
+        self.outcome = "abort"
+
+    async def continue_(self) -> None:
+        self.outcome = "continue"
+
+
+class FakeFinishedRequest:
+    url = "https://www.qoo10.jp/item/ESIM/1133241666"
+
+    def __init__(self, sizes: dict | None) -> None:
+        self._sizes = sizes
+
+    async def sizes(self) -> dict:
+        if self._sizes is None:
+            raise RuntimeError("Target page, context or browser has been closed")
+        return self._sizes
+
+
+def test_amazon_policy_blocks_images_and_ad_hosts_but_keeps_documents_and_scripts():
+    policy = AmazonJPAdapter.resource_policy
+
+    assert policy.blocks("image", "https://m.media-amazon.com/images/I/61abc.jpg")
+    assert policy.blocks("font", "https://m.media-amazon.com/fonts/ember.woff2")
+    assert policy.blocks("script", "https://aax-fe.amazon-adsystem.com/e/dtb/bid")
+    assert policy.blocks("xhr", "https://unagi.amazon.co.jp/1/events/com.amazon.csm")
+    assert not policy.blocks("document", "https://www.amazon.co.jp/dp/B000000001")
+    assert not policy.blocks("script", "https://m.media-amazon.com/images/I/script.js")
+
+
+def test_allowed_hosts_override_type_and_host_blocks():
+    policy = ResourcePolicy(blocked_hosts=("example.com",), allowed_hosts=("cdn.example.com",))
+
+    assert policy.blocks("script", "https://ads.example.com/tag.js")
+    assert not policy.blocks("image", "https://cdn.example.com/sprite.png")
+
+
+def test_resource_blocker_counts_blocked_and_allowed_traffic():
+    blocker = ResourceBlocker(ResourcePolicy())
+    routes = [
+        FakeRoute("document", "https://www.qoo10.jp/item/ESIM/1133241666"),
+        FakeRoute("image", "https://gd.image-qoo10.jp/li/1.jpg"),
+        FakeRoute("image", "https://gd.image-qoo10.jp/li/2.jpg"),
+        FakeRoute("script", "https://www.googletagmanager.com/gtm.js"),
+    ]
+
+    async def main() -> None:
+        for route in routes:
+            await blocker.handle(route)
+
+    asyncio.run(main())
+    # A chunked, gzip-encoded response has no content-length but still has a transfer size.
+    asyncio.run(blocker.observe_finished(FakeFinishedRequest({"responseBodySize": 51500, "responseHeadersSize": 500})))
+    asyncio.run(blocker.observe_finished(FakeFinishedRequest({"responseBodySize": -1, "responseHeadersSize": 0})))
+    asyncio.run(blocker.observe_finished(FakeFinishedRequest(None)))
+
+    assert [route.outcome for route in routes] == ["continue", "abort", "abort", "abort"]
+    assert blocker.report() == {
+        "blocked_requests": 3,
+        "blocked_by_type": {"image": 2, "script": 1},
+        "allowed_requests": 1,
+        "allowed_bytes": 52000,
+    }